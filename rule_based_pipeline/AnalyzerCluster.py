@@ -12,7 +12,7 @@ class AnalyzerCluster:
     Represents an analyzer cluster.
 
     Attributes:
-        html_cluster (HTMLCluster): The HTML cluster associated with the analyzer cluster.
+        html_cluster (HTMLCluster): The HTML cluster associated with the analyzer cluster. None, if not yet generated.
         html_page (HTMLPage): The HTML page containing the items.
         items (list): List of HTML items in the HTML page.
         default_year: The default year value.
@@ -23,7 +23,7 @@ class AnalyzerCluster:
         Initializes an AnalyzerCluster.
 
         Args:
-            html_cluster (HTMLCluster): The HTML cluster.
+            html_cluster (HTMLCluster): The HTML cluster, or None (then the page's clusters_text will be used).
             html_page (HTMLPage): The HTML page.
             default_year: The default year value.
         """
@@ -32,3 +32,14 @@ class AnalyzerCluster:
         self.items = html_page.items
         self.default_year = default_year
         self.bad_page = False
+
+    def get_html_cluster(self):
+        """
+        Gets the HTML cluster. If it has not been given, the page's clusters_text are used (and generated if required).
+
+        Returns:
+            HTMLCluster: The HTML cluster.
+        """
+        if self.html_cluster is None:
+            self.html_cluster = self.html_page.get_clusters_text()
+        return self.html_cluster
@@ -7,10 +7,13 @@
 # Note   : 1 AnalyzerDirectory refers to * AnalyzerPage (one for each HTMLPage in that directory, resp. pdf-file)
 # ============================================================================================================================
 from AnalyzerPage import AnalyzerPage
-from config_for_rb import global_analyze_multiple_pages_at_one, global_ignore_all_years
+from AnalyzerTable import AnalyzerTable
+from config_for_rb import global_analyze_multiple_pages_at_one, global_ignore_all_years, \
+    global_multiple_pages_table_margin
 from HTMLDirectory import HTMLDirectory
-from HTMLPage import HTMLPage
+from HTMLPageView import HTMLPageView
 from KPIMeasure import KPIMeasure
+from globals import print_verbose
 
 
 class AnalyzerDirectory:
@@ -20,35 +23,79 @@ class AnalyzerDirectory:
     Attributes:
         html_directory (HTMLDirectory): The HTML directory associated with the analyzer directory.
         analyzer_page (list): List of AnalyzerPage objects for each HTML page in the directory.
+        analyzer_page_txt (list): For each AnalyzerPage, the text of all items (and lower-case), used as prefilter.
         default_year: The default year value.
 
     Methods:
         fix_src_name(kpi_measures): Fixes the source file name for a list of KPI measures.
         find_kpis(kpi_specs): Finds KPIs within the entire analyzer directory.
+        find_multiple_kpis_per_kpi(kpi_specs_list): Finds multiple KPIs within the directory, separately for each KPI.
         find_multiple_kpis(kpi_specs_list): Finds multiple KPIs within the entire analyzer directory.
     """
 
-    def __init__(self, html_directory, default_year):
+    def __init__(self, html_directory, default_year, kpi_specs_list=None):
         """
         Initializes an AnalyzerDirectory.
 
         Args:
             html_directory (HTMLDirectory): The HTMLDirectory (Report).
             default_year: The default year value.
+            kpi_specs_list (list): If given, pages (and merged pages) that cannot contain any of these KPIs are skipped.
         """
         self.html_directory = html_directory
         self.analyzer_page = []
+        self.analyzer_page_txt = []
         self.default_year = default_year
 
+        page_txt = [AnalyzerDirectory.get_page_txt(page) for page in html_directory.htmlpages]
+        is_relevant = [kpi_specs_list is None or AnalyzerDirectory.may_contain_any_kpi(txt, kpi_specs_list)
+                       for txt in page_txt]
+
         # Create AnalyzerPage objects for each HTML page in the directory
         for i in range(len(self.html_directory.htmlpages)):
             page = html_directory.htmlpages[i]
-            self.analyzer_page.append(AnalyzerPage(page, default_year))
-
-            # Merge consecutive pages if specified
-            if global_analyze_multiple_pages_at_one and i < len(self.html_directory.htmlpages) - 1:
-                multiple_pages = HTMLPage.merge(page, html_directory.htmlpages[i + 1])
+            if is_relevant[i]:
+                self.analyzer_page.append(AnalyzerPage(page, default_year))
+                self.analyzer_page_txt.append(page_txt[i])
+
+            # Analyze consecutive pages at once if specified, but only if a table might continue on the next page
+            # (the view presents both pages as one, without copying them)
+            if global_analyze_multiple_pages_at_one and i < len(self.html_directory.htmlpages) - 1 and (
+                    is_relevant[i] or is_relevant[i + 1]) and HTMLPageView.has_table_at_page_break(
+                    page, html_directory.htmlpages[i + 1], global_multiple_pages_table_margin):
+                multiple_pages = HTMLPageView(page, html_directory.htmlpages[i + 1])
                 self.analyzer_page.append(AnalyzerPage(multiple_pages, default_year))
+                self.analyzer_page_txt.append((page_txt[i][0] + '\n' + page_txt[i + 1][0],
+                                               page_txt[i][1] + '\n' + page_txt[i + 1][1]))
+
+    @staticmethod
+    def get_page_txt(html_page):
+        """
+        Gets the text of all items of a page, for prefiltering with KPISpecs.may_match_txt.
+
+        Args:
+            html_page (HTMLPage): The HTML page.
+        Returns:
+            tuple: (txt, txt in lower-case)
+        """
+        txt = '\n'.join(it.txt for it in html_page.items)
+        return txt, txt.lower()
+
+    @staticmethod
+    def may_contain_any_kpi(page_txt, kpi_specs_list):
+        """
+        Checks, if a page might contain any of the given KPIs. If not, it doesn't need to be analyzed.
+
+        Args:
+            page_txt (tuple): (txt, txt in lower-case) of the page, see get_page_txt.
+            kpi_specs_list (list): List of KPI specifications.
+        Returns:
+            bool: False, if none of the KPIs can be found on this page.
+        """
+        for kpi_specs in kpi_specs_list:
+            if kpi_specs.may_match_txt(page_txt[0], page_txt[1]):
+                return True
+        return False
 
     def fix_src_name(self, kpi_measures):
         """
@@ -77,21 +124,41 @@ class AnalyzerDirectory:
         Returns:
             list: List of KPI measures found within the analyzer directory.
         """
-        result = []
+        return self.find_multiple_kpis_per_kpi([kpi_specs])[0]
 
-        # Iterate through each AnalyzerPage and find KPIs
-        for page in self.analyzer_page:
-            result.extend(page.find_kpis(kpi_specs))
+    def find_multiple_kpis_per_kpi(self, kpi_specs_list):
+        """
+        Finds multiple KPIs within the entire analyzer directory. Each page (and table) is visited only once.
 
-        # Remove all years if specified
-        if global_ignore_all_years:
-            result = KPIMeasure.remove_all_years(result)
+        Args:
+            kpi_specs_list (list): List of KPI specifications.
+        Returns:
+            list: For each KPI, the list of KPI measures found within the analyzer directory (same as find_kpis).
+        """
+        results = [[] for k in kpi_specs_list]
 
-        # Remove duplicate KPI measures and those with scores below the minimum
-        result = KPIMeasure.remove_duplicates(result)
-        result = KPIMeasure.remove_bad_scores(result, kpi_specs.minimum_score)
+        # Iterate through each AnalyzerPage and find KPIs (skip pages, on which a KPI cannot be found)
+        for page, page_txt in zip(self.analyzer_page, self.analyzer_page_txt):
+            cur_kpi_nums = [k for k in range(len(kpi_specs_list)) if
+                            kpi_specs_list[k].may_match_txt(page_txt[0], page_txt[1])]
+            if len(cur_kpi_nums) == 0:
+                continue
+            cur_results = page.find_multiple_kpis([kpi_specs_list[k] for k in cur_kpi_nums])
+            for k, cur_result in zip(cur_kpi_nums, cur_results):
+                results[k].extend(cur_result)
 
-        return result
+        for k in range(len(kpi_specs_list)):
+            result = results[k]
+
+            # Remove all years if specified
+            if global_ignore_all_years:
+                result = KPIMeasure.remove_all_years(result)
+
+            # Remove duplicate KPI measures and those with scores below the minimum
+            result = KPIMeasure.remove_duplicates(result)
+            results[k] = KPIMeasure.remove_bad_scores(result, kpi_specs_list[k].minimum_score)
+
+        return results
 
     def find_multiple_kpis(self, kpi_specs_list):
         """
@@ -105,12 +172,15 @@ class AnalyzerDirectory:
         """
 
         result = []
+        AnalyzerTable.reset_memo_stats()
 
-        # Iterate through each KPI specification and find KPIs
-        for kpi_spec in kpi_specs_list:
-            result.extend(self.find_kpis(kpi_spec))
+        # Find all KPIs in a single pass, and concatenate the results in the order of the KPI specifications
+        for cur_result in self.find_multiple_kpis_per_kpi(kpi_specs_list):
+            result.extend(cur_result)
 
         # Remove KPIs with bad years, duplicates, and fix source file names
+        print_verbose(2, 'Txt node memo stats: ' + str(AnalyzerTable.memo_stats))
+
         result = KPIMeasure.remove_bad_years(result, self.default_year)
         result = KPIMeasure.remove_duplicates(result)
         result = self.fix_src_name(result)
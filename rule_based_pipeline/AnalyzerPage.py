@@ -19,35 +19,87 @@ class AnalyzerPage:
     Represents an analyzer page that contains methods for finding KPIs within the page.
 
     Attributes:
-        html_page (HTMLPage): The HTML page associated with the analyzer page.
-        analyzer_table (list): List of AnalyzerTable objects for each HTML table in the page.
+        html_page (HTMLPage): The HTML page associated with the analyzer page (or an HTMLPageView of two pages).
+        analyzer_table (list): For each HTML table in the page, a list of AnalyzerTable objects (for the table and its
+            sub-tables), or None if not yet generated. See get_analyzer_tables.
+        table_txt (list): For each HTML table in the page, the text of its items (and lower-case), or None if not yet
+            generated. See get_table_txt.
         analyzer_cluster (list): List of AnalyzerCluster objects for each cluster in the page.
         default_year: The default year value.
     Methods:
+        get_analyzer_tables(table_num): Gets the AnalyzerTables for a table (generated on first use).
+        get_all_analyzer_tables(): Gets the AnalyzerTables for all tables.
+        get_table_txt(table_num): Gets the text of a table, used as prefilter.
         find_kpis(kpi_specs): Finds KPIs within the analyzer page.
+        find_multiple_kpis(kpi_specs_list): Finds multiple KPIs within the analyzer page, in a single pass.
     """
     def __init__(self, html_page, default_year):
         """
         Initializes an AnalyzerPage.
 
         Args:
-            html_page (HTMLPage): The HTML page.
+            html_page (HTMLPage): The HTML page, or an HTMLPageView.
             default_year: The default year value.
         """
         self.html_page = html_page
 
-        self.analyzer_table = []
-        for table in self.html_page.tables:
-            self.analyzer_table.append(AnalyzerTable(table, self.html_page, default_year))
-            sub_tabs = table.generate_sub_tables()
-            for sub_tab in sub_tabs:
-                self.analyzer_table.append(AnalyzerTable(sub_tab, self.html_page, default_year))
+        # AnalyzerTables are generated on first use, so only tables that are actually analyzed have to be prepared
+        self.analyzer_table = [None] * len(self.html_page.tables)
+        self.table_txt = [None] * len(self.html_page.tables)
 
         self.analyzer_cluster = []
+        # clusters_text are only generated, if the AnalyzerCluster actually needs them
         self.analyzer_cluster.append(AnalyzerCluster(html_page.clusters_text, html_page, default_year))
 
         self.default_year = default_year
 
+    def get_analyzer_tables(self, table_num):
+        """
+        Gets the AnalyzerTables for a table and its sub-tables. They are generated on first use.
+
+        Args:
+            table_num (int): Index of the table in html_page.tables.
+        Returns:
+            list: List of AnalyzerTable objects, the first one is for the table itself.
+        """
+        if self.analyzer_table[table_num] is None:
+            table = self.html_page.tables[table_num]
+            cur_analyzer_table = AnalyzerTable(table, self.html_page, self.default_year)
+            res = [cur_analyzer_table]
+            sub_tabs = table.generate_sub_tables()
+            for sub_tab in sub_tabs:
+                res.append(AnalyzerTable(sub_tab, self.html_page, self.default_year, cur_analyzer_table))
+            self.analyzer_table[table_num] = res
+        return self.analyzer_table[table_num]
+
+    def get_all_analyzer_tables(self):
+        """
+        Gets the AnalyzerTables for all tables and sub-tables (and generates them, if required).
+
+        Returns:
+            list: List of AnalyzerTable objects.
+        """
+        res = []
+        for i in range(len(self.html_page.tables)):
+            res.extend(self.get_analyzer_tables(i))
+        return res
+
+    def get_table_txt(self, table_num):
+        """
+        Gets the text of all items of a table (cells, headlines and special items), for prefiltering with
+        KPISpecs.may_match_txt. Sub-tables contain only items of their table, so this is valid for them, too.
+
+        Args:
+            table_num (int): Index of the table in html_page.tables.
+        Returns:
+            tuple: (txt, txt in lower-case)
+        """
+        if self.table_txt[table_num] is None:
+            table = self.html_page.tables[table_num]
+            txt = '\n'.join(table.items[i].txt for i in table.get_all_idx() if i != -1)
+            self.table_txt[table_num] = (txt, txt.lower())
+        return self.table_txt[table_num]
+
     def find_kpis(self, kpi_specs):
         """
         Finds all KPIs within the analyzer page.
@@ -60,11 +112,44 @@ class AnalyzerPage:
         print_verbose(1, " ==>>>> FIND KPIS '" + kpi_specs.kpi_name + "' ON PAGE: " + str(
             self.html_page.page_num) + " <<<<<=====")
 
-        result = []
-        # 1. Tables
-        for table in self.analyzer_table:
-            result.extend(table.find_kpis(kpi_specs))
+        return self.find_multiple_kpis([kpi_specs])[0]
+
+    def find_multiple_kpis(self, kpi_specs_list):
+        """
+        Finds multiple KPIs within the analyzer page. Each table is visited only once, and analyzed for all KPIs.
+        The candidates of a table (txt nodes, values, ...) are shared by all KPIs (see AnalyzerTable).
+        The result is the same as calling find_kpis for each KPI.
 
+        Args:
+            kpi_specs_list (list): List of KPI specifications.
+        Returns:
+            list: For each KPI, the list of KPI measures found within the analyzer page.
+        """
+        print_verbose(1, " ==>>>> FIND KPIS " + str([k.kpi_name for k in kpi_specs_list]) + " ON PAGE: " + str(
+            self.html_page.page_num) + " <<<<<=====")
+
+        results = [[] for k in kpi_specs_list]
+        # 1. Tables (skip tables, in which a KPI cannot be found)
+        for i in range(len(self.html_page.tables)):
+            cur_kpis = [(kpi_specs, result) for kpi_specs, result in zip(kpi_specs_list, results) if
+                        kpi_specs.may_match_txt(*self.get_table_txt(i))]
+            if len(cur_kpis) == 0:
+                continue
+            for table in self.get_analyzer_tables(i):
+                for kpi_specs, result in cur_kpis:
+                    result.extend(table.find_kpis(kpi_specs))
+
+        return [self.cleanup_kpis(result) for result in results]
+
+    def cleanup_kpis(self, result):
+        """
+        Removes duplicates and transforms coordinates of the KPI measures found for one KPI on this page.
+
+        Args:
+            result (list): List of KPI measures.
+        Returns:
+            list: List of KPI measures.
+        """
         # 2. Remove duplicates
         result = KPIMeasure.remove_duplicates(result)
 
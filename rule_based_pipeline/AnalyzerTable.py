@@ -7,7 +7,8 @@
 # Note   : 1 AnalyzerPage refers to * AnalyzerTable (one for each HTMLTable on that page)
 # ============================================================================================================================
 from FormatAnalyzer import FormatAnalyzer
-from globals import print_verbose, ALIGN_LEFT
+from HTMLPageView import HTMLPageView
+from globals import print_verbose, ALIGN_LEFT, FORMAT_NUMERIC, FORMAT_WEAK_NUMERIC, FORMAT_YEAR
 from KPIMeasure import KPIMeasure
 from Rect import Rect
 
@@ -40,11 +41,27 @@ class AnalyzerTable:
             return '<row_num=' + str(self.row_num) + ', years=' + str(self.years) + '>'
 
     htmltable = None
-    htmlpage = None
+    htmlpage = None  # HTMLPage or HTMLPageView
     items = None
     default_year = None
+    page_location = None  # if htmlpage is an HTMLPageView: (page_num, item_offset, offset_y) of htmltable's page in it
 
     table_hierarchy = None  # for each ix, a reference to the parent ix (or -1, if root)
+    depths = None  # for each dir, the depth of each ix (calculated on first use)
+
+    # candidates for KPIs, i.e. everything that doesn't depend on the KPISpecs. calculated on first use,
+    # and then shared by all KPIs
+    candidates_direct = None  # for each row: txt_nodes
+    values_direct = None  # row -> (value_row, value_items), see find_applicable_items_for_table_with_years
+    candidates_indirect = None  # for each fixed left col: (col, for each row: (txt_nodes_row, font_size_row_node, value_row, years))
+
+    # memo for get_txt_nodes, get_aligned_multirow_txt_with_rect and get_txt_nodes_above: name -> (args -> result).
+    # results are shared, and must not be modified
+    memo = None
+
+    # counters of memo lookups, summed up over all tables (class-level). see reset_memo_stats
+    memo_stats = {'txt_nodes': {'calls': 0, 'hits': 0}, 'multirow_txt': {'calls': 0, 'hits': 0},
+                  'txt_nodes_above': {'calls': 0, 'hits': 0}}
     year_rows = None  # all rows containing years, each will be a YearRow
 
     def get_num_cols(self):
@@ -68,6 +85,24 @@ class AnalyzerTable:
     def get_item(self, i, j):
         return self.htmltable.get_item(i, j)
 
+    def get_page_num(self):
+        # number of the page, on which htmltable is located
+        return self.htmlpage.page_num if self.page_location is None else self.page_location[0]
+
+    def get_page_idx(self, it):
+        # index of an item of htmltable in htmlpage.items
+        return it.this_id if self.page_location is None else it.this_id + self.page_location[1]
+
+    def get_page_pos_y(self, it):
+        # y-coordinate of an item of htmltable on htmlpage
+        return it.pos_y if self.page_location is None else it.pos_y + self.page_location[2]
+
+    def get_page_rect(self, rect):
+        # rect of htmltable's page -> rect on htmlpage. always a copy, so callers may modify the result: the
+        # HTMLTable (and its rects) is shared by all KPIs, and by the HTMLPageViews containing its page
+        offset_y = 0 if self.page_location is None else self.page_location[2]
+        return Rect(rect.x0, rect.y0 + offset_y, rect.x1, rect.y1 + offset_y)
+
     def find_next_non_empty_cell_return_row_only(self, i, j, dir):
         while 0 < i < self.get_num_rows() - 1:
             i += dir
@@ -75,7 +110,7 @@ class AnalyzerTable:
                 return i
         return -1  # not found
 
-    def get_depth(self, i, j, dir):
+    def calculate_depth(self, i, j, dir):
         ident_threshold = (3.0 / 609.0) * self.htmlpage.page_width if dir == HIERARCHY_DIR_UP else (
                                                                                                            3.0 / 609.0) * self.htmlpage.page_height
 
@@ -86,6 +121,15 @@ class AnalyzerTable:
             return it.get_depth() + (int(it.pos_x / ident_threshold) * 10000 if it.alignment == ALIGN_LEFT else 0)
         return it.get_depth() + (int(it.pos_y / ident_threshold) * 10000 if it.alignment == ALIGN_LEFT else 0)
 
+    def calculate_all_depths(self, dir):
+        self.depths[dir] = [self.calculate_depth(i, j, dir) for i in range(self.get_num_rows())
+                            for j in range(self.get_num_cols())]
+
+    def get_depth(self, i, j, dir):
+        if self.depths[dir] is None:
+            self.calculate_all_depths(dir)
+        return self.depths[dir][self.get_ix(i, j)]
+
     def find_next_parent_cell(self, r0, c0, dir):  # row=r0, col=c0
         # print("------------>> find_next_parent_cell: "+ str(r0) + ',' + str(c0) )
         d0 = self.get_depth(r0, c0, dir)
@@ -108,11 +152,66 @@ class AnalyzerTable:
         return -1  # not found / root
 
     def calculate_hierarchy(self, dir):
+        # same result as find_next_parent_cell for each cell, but in linear time:
+        # we walk along each col (or row), and keep a stack of the cells seen so far with strictly
+        # increasing depths. the parent is the nearest previous cell with a lower depth
+        num_lines, line_len = (self.get_num_cols(), self.get_num_rows()) if dir == HIERARCHY_DIR_UP else (
+            self.get_num_rows(), self.get_num_cols())
+        for a in range(num_lines):
+            stack = []  # (depth, ix)
+            for b in range(line_len):
+                i, j = (b, a) if dir == HIERARCHY_DIR_UP else (a, b)
+                ix = self.get_ix(i, j)
+                d = self.get_depth(i, j, dir)
+                if d == 999999999:
+                    self.table_hierarchy[dir][ix] = -1  # empty cell
+                    continue
+                while len(stack) > 0 and stack[-1][0] >= d:
+                    stack.pop()
+                self.table_hierarchy[dir][ix] = stack[-1][1] if len(stack) > 0 else -1
+                stack.append((d, ix))
+
+    def derive_hierarchy_from_parent(self, parent):
+        # for sub-tables (col ranges of the parent's table), the hierarchy is the same as the parent's one:
+        # upwards, only the same col is searched. to the left, the parent is only found in the sub-table,
+        # if it is not left of the first col
+        c0 = self.htmltable.parent_col0
         for i in range(self.get_num_rows()):
             for j in range(self.get_num_cols()):
-                self.table_hierarchy[dir][self.get_ix(i, j)] = self.find_next_parent_cell(i, j, dir)
+                parent_ix = parent.get_ix(i, j + c0)
+                up_ix = parent.table_hierarchy[HIERARCHY_DIR_UP][parent_ix]
+                left_ix = parent.table_hierarchy[HIERARCHY_DIR_LEFT][parent_ix]
+                ix = self.get_ix(i, j)
+                if up_ix == -1:
+                    self.table_hierarchy[HIERARCHY_DIR_UP][ix] = -1
+                else:
+                    self.table_hierarchy[HIERARCHY_DIR_UP][ix] = self.get_ix(parent.get_row_and_col_by_ix(up_ix)[0], j)
+                left_col = -1 if left_ix == -1 else parent.get_row_and_col_by_ix(left_ix)[1]
+                self.table_hierarchy[HIERARCHY_DIR_LEFT][ix] = -1 if left_col < c0 else self.get_ix(i, left_col - c0)
+
+    @staticmethod
+    def reset_memo_stats():
+        # counters are class-level, so they must be reset, before a new directory is analyzed
+        for stats in AnalyzerTable.memo_stats.values():
+            stats['calls'] = 0
+            stats['hits'] = 0
+
+    def lookup_memo(self, name, args, calc):
+        # returns calc(*args), but calculates it only once per table
+        stats = AnalyzerTable.memo_stats[name]
+        stats['calls'] += 1
+        cur_memo = self.memo[name]
+        if args in cur_memo:
+            stats['hits'] += 1
+            return cur_memo[args]
+        res = calc(*args)
+        cur_memo[args] = res
+        return res
 
     def get_aligned_multirow_txt_with_rect(self, r0, c0):
+        return self.lookup_memo('multirow_txt', (r0, c0), self.calculate_aligned_multirow_txt_with_rect)
+
+    def calculate_aligned_multirow_txt_with_rect(self, r0, c0):
         def go(dir, init_depth):
             res = []
             rect = Rect(9999999, 9999999, -1, -1)
@@ -127,7 +226,7 @@ class AnalyzerTable:
                 for j in range(self.get_num_cols()):
                     if j == c0:
                         continue
-                    if self.has_item_at(r, j) and FormatAnalyzer.looks_weak_numeric(self.get_item(r, j).txt):
+                    if self.has_item_at(r, j) and FormatAnalyzer.has_format(self.get_item(r, j), FORMAT_WEAK_NUMERIC):
                         has_num_values = True
                         break
                 if has_num_values:
@@ -166,6 +265,9 @@ class AnalyzerTable:
         return res, rect
 
     def get_txt_nodes(self, r0, c0, dir, include_special_items):
+        return self.lookup_memo('txt_nodes', (r0, c0, dir, include_special_items), self.calculate_txt_nodes)
+
+    def calculate_txt_nodes(self, r0, c0, dir, include_special_items):
         res = []
         ix = self.get_ix(r0, c0)
         rect = Rect(9999999, 9999999, -1, -1)
@@ -182,10 +284,14 @@ class AnalyzerTable:
         if include_special_items:
             sp_idx = self.htmltable.find_special_item_idx_in_rect(rect)
             for i in sp_idx:
-                res.append(self.items[i].txt)
+                res.append(self.htmltable.items[i].txt)
         return res
 
     def get_txt_nodes_above(self, r0, c0, include_special_items, break_at_number):
+        return self.lookup_memo('txt_nodes_above', (r0, c0, include_special_items, break_at_number),
+                                self.calculate_txt_nodes_above)
+
+    def calculate_txt_nodes_above(self, r0, c0, include_special_items, break_at_number):
         # search for text items that are above the current cell
         res = []
         r = r0
@@ -205,13 +311,13 @@ class AnalyzerTable:
             rect.y0 = 0
             sp_idx = self.htmltable.find_special_item_idx_in_rect(rect)
             for i in sp_idx:
-                res.append(self.items[i].txt)
+                res.append(self.htmltable.items[i].txt)
         return res
 
     def get_txt_headline(self):
         res = []
         for h_idx in self.htmltable.headline_idx:
-            res.append(self.items[h_idx].txt)
+            res.append(self.htmltable.items[h_idx].txt)
         return res
 
     def row_looks_like_year_line(self, r0):
@@ -220,13 +326,13 @@ class AnalyzerTable:
         res = {}
         for j in range(self.get_num_cols()):
             if self.has_item_at(r0, j):
-                txt = self.get_item(r0, j).txt
-                if FormatAnalyzer.looks_year(txt):
+                it = self.get_item(r0, j)
+                if FormatAnalyzer.has_format(it, FORMAT_YEAR):
                     num_years += 1
-                    y = FormatAnalyzer.to_year(self.get_item(r0, j).txt)
+                    y = FormatAnalyzer.get_year(it)
                     if y not in res:
                         res[y] = (r0, j)
-                elif FormatAnalyzer.looks_numeric(txt):
+                elif FormatAnalyzer.has_format(it, FORMAT_NUMERIC):
                     # some other number occurred => this is probably not a line of years
                     return None
 
@@ -304,7 +410,7 @@ class AnalyzerTable:
 
         def contains_items(r):  # check if dict d contains some items at all
             for j in range(self.get_num_cols()):
-                if self.has_item_at(r, j) and FormatAnalyzer.looks_numeric(self.get_item(r, j).txt):
+                if self.has_item_at(r, j) and FormatAnalyzer.has_format(self.get_item(r, j), FORMAT_NUMERIC):
                     return True
             return False
 
@@ -336,7 +442,7 @@ class AnalyzerTable:
             return sp_item.txt
 
         # look for other unit items
-        search_rect = self.htmltable.rows[r0]
+        search_rect = self.get_page_rect(self.htmltable.rows[r0])
         search_rect.y0 = 0  # self.htmltable.table_rect.y0 - self.htmlpage.page_height * 0.125
         items_idx = self.htmlpage.find_items_within_rect(search_rect, [CAT_HEADLINE, CAT_OTHER_TEXT, CAT_TABLE_DATA,
                                                                        CAT_TABLE_HEADLINE, CAT_TABLE_SPECIAL, CAT_MISC,
@@ -347,7 +453,7 @@ class AnalyzerTable:
             print_verbose(10, '.......trying instead: ' + txt)
             if kpispecs.match_unit(txt):
                 print_verbose(10, '...........===> match!')
-                if match_idx == -1 or self.items[i].pos_y > self.items[match_idx].pos_y:
+                if match_idx == -1 or self.htmlpage.get_item_rect(i).y0 > self.htmlpage.get_item_rect(match_idx).y0:
                     print_verbose(10, '...........===> better then previous match. new match_idx=' + str(i))
                     match_idx = i
         if match_idx != -1:
@@ -363,7 +469,7 @@ class AnalyzerTable:
         best_dist = 9999999
         for i in items_idx:
             it = self.items[i]
-            cur_x, cur_y = it.get_rect().get_center()
+            cur_x, cur_y = self.htmlpage.get_item_rect(i).get_center()
             dist_x = abs(cur_x - base_pos_x)
             dist_y = abs(cur_y - base_pos_y)
             if cur_x > base_pos_x:
@@ -375,8 +481,8 @@ class AnalyzerTable:
                 for w in it.words:
                     cur_year = None
                     if not aggressive_year_pattern:
-                        if FormatAnalyzer.looks_year(w.txt):
-                            cur_year = FormatAnalyzer.to_year(w.txt)  # by Lei
+                        if FormatAnalyzer.has_format(w, FORMAT_YEAR):
+                            cur_year = FormatAnalyzer.get_year(w)  # by Lei
                         # cur_year = int(w.txt)
                     else:
                         cur_year = FormatAnalyzer.looks_year_extended(w.txt)
@@ -389,6 +495,42 @@ class AnalyzerTable:
 
         return best_year
 
+    def get_candidates_with_direct_years(self):
+        # txt nodes of each row (without previous_txt_node_with_no_values, which depends on the KPI)
+        if self.candidates_direct is None:
+            self.candidates_direct = [self.get_txt_nodes(i, 0, HIERARCHY_DIR_UP, True) for i in
+                                      range(self.get_num_rows())]
+        return self.candidates_direct
+
+    def get_values_with_direct_years(self, r0):
+        if r0 not in self.values_direct:
+            self.values_direct[r0] = self.find_applicable_items_for_table_with_years(r0)
+        return self.values_direct[r0]
+
+    def get_candidates_with_indirect_years(self):
+        if self.candidates_indirect is None:
+            # find possible fixed left columns
+            fixed_left_cols = [0]
+            for j in range(1, self.get_num_cols()):
+                if self.htmltable.col_looks_like_text_col(j):
+                    fixed_left_cols.append(j)
+
+            print_verbose(6, 'fixed_left_cols=' + str(fixed_left_cols))
+
+            self.candidates_indirect = []
+            for fixed_left_column in fixed_left_cols:
+                rows = []
+                for i in range(self.get_num_rows()):
+                    txt_nodes_row = self.get_txt_nodes(i, fixed_left_column, HIERARCHY_DIR_UP, True)
+                    font_size_row_node = None
+                    if self.has_item_at(i, fixed_left_column):
+                        font_size_row_node = self.get_item(i, fixed_left_column).font_size
+                    value_row = self.find_applicable_row_with_items_for_any_left_oriented_table(i)
+                    years = None if value_row is None else self.find_applicable_year_line(i)
+                    rows.append((txt_nodes_row, font_size_row_node, value_row, years))
+                self.candidates_indirect.append((fixed_left_column, rows))
+        return self.candidates_indirect
+
     def find_kpi_with_direct_years(self, kpispecs, bonus):
         # find KPIs that are directly aligned with year headline
         # Example:
@@ -422,17 +564,19 @@ class AnalyzerTable:
 
         previous_txt_node_with_no_values = ''
 
+        candidates = self.get_candidates_with_direct_years()
+
         for i in range(self.get_num_rows()):
-            txt_nodes = self.get_txt_nodes(i, 0, HIERARCHY_DIR_UP, True)
-            txt_nodes = txt_nodes + ([
-                                         previous_txt_node_with_no_values] if previous_txt_node_with_no_values != '' and previous_txt_node_with_no_values not in txt_nodes else [])
+            row_nodes = candidates[i]
+            txt_nodes = row_nodes + ([
+                                         previous_txt_node_with_no_values] if previous_txt_node_with_no_values != '' and previous_txt_node_with_no_values not in row_nodes else [])
             print_verbose(5, 'Looking at row i=' + str(i) + ', txt_nodes=' + str(txt_nodes))
             txt_match, score = kpispecs.match_nodes(txt_nodes)
             print_verbose(5, '---> score=' + str(score))
             if not txt_match:
                 print_verbose(5, '---> No match')
                 continue  # no match
-            value_row, value_items = self.find_applicable_items_for_table_with_years(i)
+            value_row, value_items = self.get_values_with_direct_years(i)
             if value_items is None:
                 print_verbose(5, '---> No values found')
                 if self.has_item_at(i, 0):
@@ -445,7 +589,7 @@ class AnalyzerTable:
             for y, it in value_items.items():
                 if it is None:
                     continue
-                if not kpispecs.match_value(it.txt):
+                if not kpispecs.match_value(it.txt, FormatAnalyzer.get_format_flags(it)):
                     missmatch_value = True
                     break
             if missmatch_value:
@@ -471,7 +615,8 @@ class AnalyzerTable:
                 if it is None:
                     continue
 
-                anywhere_match, anywhere_match_score = kpispecs.match_anywhere_on_page(self.htmlpage, it.this_id)
+                anywhere_match, anywhere_match_score = kpispecs.match_anywhere_on_page(self.htmlpage,
+                                                                                       self.get_page_idx(it))
                 if not anywhere_match:
                     print_verbose(5, '---> anywhere-match was not matched on this page. No other match possible.')
                     return []
@@ -486,10 +631,10 @@ class AnalyzerTable:
                 kpi_measure.kpi_id = kpispecs.kpi_id
                 kpi_measure.kpi_name = kpispecs.kpi_name
                 kpi_measure.src_file = 'TODO'
-                kpi_measure.page_num = self.htmlpage.page_num
+                kpi_measure.page_num = self.get_page_num()
                 kpi_measure.item_ids = [it.this_id]
                 kpi_measure.pos_x = it.pos_x
-                kpi_measure.pos_y = it.pos_y
+                kpi_measure.pos_y = self.get_page_pos_y(it)
                 kpi_measure.raw_txt = it.txt
                 kpi_measure.year = y
                 kpi_measure.value = kpispecs.extract_value(it.txt)
@@ -531,27 +676,14 @@ class AnalyzerTable:
         # normal score from actual items:
         res = []
 
-        # find possible fixed left columns
-        fixed_left_cols = [0]
-        for j in range(1, self.get_num_cols()):
-            if self.htmltable.col_looks_like_text_col(j):
-                fixed_left_cols.append(j)
-
-        print_verbose(6, 'fixed_left_cols=' + str(fixed_left_cols))
-
-        for fixed_left_column in fixed_left_cols:
+        for fixed_left_column, candidates in self.get_candidates_with_indirect_years():
             # fixed_left_column = 6
             for i in range(self.get_num_rows()):
-                txt_nodes_row = self.get_txt_nodes(i, fixed_left_column, HIERARCHY_DIR_UP, True)
-                font_size_row_node = None
-                if self.has_item_at(i, fixed_left_column):
-                    font_size_row_node = self.get_item(i, fixed_left_column).font_size
+                txt_nodes_row, font_size_row_node, value_row, years = candidates[i]
 
                 print_verbose(5, 'Looking at row i=' + str(i) + ', txt_nodes_row=' + str(
                     txt_nodes_row) + ',fonz_size=' + str(font_size_row_node))
 
-                value_row = self.find_applicable_row_with_items_for_any_left_oriented_table(i)
-
                 if value_row is None:
                     print_verbose(5, '---> No values found')
                     continue  # no values found
@@ -564,8 +696,6 @@ class AnalyzerTable:
                     print_verbose(5, '---> Unit not matched')
                     continue  # unit not matched
 
-                years = self.find_applicable_year_line(i)
-
                 print_verbose(5, '--> years= ' + str(years))
                 for j in range(fixed_left_column + 1, self.get_num_cols()):
                     if not self.has_item_at(value_row, j):
@@ -580,7 +710,7 @@ class AnalyzerTable:
                             font_size_cell < font_size_row_node / 1.75 or font_size_cell > font_size_row_node * 1.75)):
                         print_verbose(5, '---> Fontsize missmatch')
                         continue  # value missmatch
-                    if not kpispecs.match_value(value_txt):
+                    if not kpispecs.match_value(value_txt, FormatAnalyzer.get_format_flags(it)):
                         print_verbose(5, '---> Value missmatch')
                         continue  # value missmatch
 
@@ -602,7 +732,7 @@ class AnalyzerTable:
                             cur_diff = abs(cell[1] - j)
                             if cur_diff < min_diff:
                                 min_diff = cur_diff
-                                kpi_year = FormatAnalyzer.to_year(self.get_item(cell[0], cell[1]).txt)  # by Lei
+                                kpi_year = FormatAnalyzer.get_year(self.get_item(cell[0], cell[1]))  # by Lei
                             if cell[0] == i and cell[1] == j:
                                 # we matched the year as value itself => must be wrong
                                 bad_year_match = True
@@ -614,8 +744,8 @@ class AnalyzerTable:
                     # if still no year found, then search more
                     if kpi_year == -1:
                         print_verbose(7, '......---> no year found. searching more agressively')
-                        search_rect = self.htmltable.table_rect
-                        search_rect.y1 = it.pos_y
+                        search_rect = self.get_page_rect(self.htmltable.table_rect)
+                        search_rect.y1 = self.get_page_pos_y(it)
                         next_non_empty_row = self.find_next_non_empty_cell_return_row_only(value_row, j, DIR_DOWNWARDS)
                         max_add = 999999  # we also want to to look a LITTLE bit downwards, in case of two-line-description cells that refer to this cell
                         if next_non_empty_row != -1:
@@ -624,7 +754,7 @@ class AnalyzerTable:
                         search_rect.y1 += min(it.height * 1.0, max_add)
                         print_verbose(8, '..............-> max_add=' + str(max_add) + ', y1(old)=' + str(
                             it.pos_y) + ', y1(new)=' + str(search_rect.y1))
-                        base_pos_x, base_pos_y = it.get_rect().get_center()
+                        base_pos_x, base_pos_y = self.get_page_rect(it.get_rect()).get_center()
                         kpi_year = self.search_year_agressive(search_rect, self.default_year - 10, self.default_year,
                                                               base_pos_x, base_pos_y, aggressive_year_pattern=False)
                         if kpi_year == -1:
@@ -643,7 +773,8 @@ class AnalyzerTable:
                         print_verbose(7, '.........-> year found=' + str(
                             kpi_year) if kpi_year != -1 else '..........-> still nothing found. give up.')
 
-                    anywhere_match, anywhere_match_score = kpispecs.match_anywhere_on_page(self.htmlpage, it.this_id)
+                    anywhere_match, anywhere_match_score = kpispecs.match_anywhere_on_page(self.htmlpage,
+                                                                                           self.get_page_idx(it))
                     if not anywhere_match:
                         print_verbose(5, '---> anywhere-match was not matched on this page. No other match possible.')
                         return []
@@ -659,10 +790,10 @@ class AnalyzerTable:
                     kpi_measure.kpi_id = kpispecs.kpi_id
                     kpi_measure.kpi_name = kpispecs.kpi_name
                     kpi_measure.src_file = 'TODO'
-                    kpi_measure.page_num = self.htmlpage.page_num
+                    kpi_measure.page_num = self.get_page_num()
                     kpi_measure.item_ids = [it.this_id]
                     kpi_measure.pos_x = it.pos_x
-                    kpi_measure.pos_y = it.pos_y
+                    kpi_measure.pos_y = self.get_page_pos_y(it)
                     kpi_measure.raw_txt = it.txt
                     kpi_measure.year = kpi_year if kpi_year != -1 else self.default_year
                     kpi_measure.value = kpispecs.extract_value(it.txt)
@@ -712,15 +843,24 @@ class AnalyzerTable:
 
         return res
 
-    def __init__(self, htmltable, htmlpage, default_year):
+    def __init__(self, htmltable, htmlpage, default_year, parent=None):
+        # parent: AnalyzerTable of htmltable.parent_table, if htmltable is a sub-table. then the hierarchy is reused
         self.htmltable = htmltable
         self.htmlpage = htmlpage
         self.items = htmlpage.items
+        if isinstance(htmlpage, HTMLPageView):
+            self.page_location = htmlpage.get_table_location(htmltable)
         self.default_year = default_year
         self.table_hierarchy = []
+        self.depths = [None, None]
+        self.memo = {name: {} for name in AnalyzerTable.memo_stats}
         for i in range(2):
             self.table_hierarchy.append([-2] * len(self.htmltable.idx))
-        self.calculate_hierarchy(HIERARCHY_DIR_UP)
-        self.calculate_hierarchy(HIERARCHY_DIR_LEFT)
+        if parent is not None and parent.htmltable is htmltable.parent_table:
+            self.derive_hierarchy_from_parent(parent)
+        else:
+            self.calculate_hierarchy(HIERARCHY_DIR_UP)
+            self.calculate_hierarchy(HIERARCHY_DIR_LEFT)
         self.years = []
         self.find_all_year_rows()
+        self.values_direct = {}
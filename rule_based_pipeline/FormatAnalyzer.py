@@ -5,7 +5,8 @@
 # Date   : 12.06.2020
 # ============================================================================================================================
 import re
-from globals import remove_bad_chars
+from globals import remove_bad_chars, FORMAT_NUMERIC, FORMAT_WEAK_NUMERIC, FORMAT_YEAR, FORMAT_PERCENTAGE, \
+    FORMAT_WORDS, FORMAT_RUNNING_TEXT
 
 
 class FormatAnalyzer:
@@ -315,6 +316,114 @@ class FormatAnalyzer:
         return ((num_full_stops > 2) or (num_full_stops > 1 and num_comma > 1)) and (num_letters > 30) and (
                     num_space > 10)
 
+    @staticmethod
+    def classify(val):
+        """
+        Classify the given value by all looks_* checks at once.
+
+        Args:
+            val (str): The input value.
+
+        Returns:
+            tuple: (flags, year, number), where flags is a combination of the FORMAT_* flags, year is the converted
+                   year (None if the value does not look like a year) and number is the converted number (None if
+                   the value does not look numeric or cannot be converted).
+        """
+        flags = 0
+        if FormatAnalyzer.looks_numeric(val):
+            flags |= FORMAT_NUMERIC
+        if FormatAnalyzer.looks_weak_numeric(val):
+            flags |= FORMAT_WEAK_NUMERIC
+            if '%' in val:
+                flags |= FORMAT_PERCENTAGE
+        if FormatAnalyzer.looks_year(val):
+            flags |= FORMAT_YEAR
+        if FormatAnalyzer.looks_words(val):
+            flags |= FORMAT_WORDS
+            # running text needs at least 20 letters, so it can only occur if the value also looks like words
+            if FormatAnalyzer.looks_running_text(val):
+                flags |= FORMAT_RUNNING_TEXT
+
+        year = FormatAnalyzer.to_year(val) if flags & FORMAT_YEAR else None
+        number = None
+        if flags & FORMAT_NUMERIC:
+            try:
+                number = FormatAnalyzer.to_float_number(val)
+            except ValueError:
+                pass  # e.g. a single "-"
+        return flags, year, number
+
+    @staticmethod
+    def get_format_info(obj):
+        """
+        Get the classification of the text of an HTMLItem or HTMLWord. It is computed on first use and cached in
+        obj.format_info, together with the text it belongs to, so that it is recomputed whenever obj.txt changes.
+
+        Args:
+            obj: An HTMLItem or HTMLWord.
+
+        Returns:
+            tuple: (txt, flags, year, number), see classify.
+        """
+        info = obj.format_info
+        if info is None or info[0] is not obj.txt:
+            info = (obj.txt,) + FormatAnalyzer.classify(obj.txt)
+            obj.format_info = info
+        return info
+
+    @staticmethod
+    def get_format_flags(obj):
+        """
+        Get the FORMAT_* flags of the text of an HTMLItem or HTMLWord.
+
+        Args:
+            obj: An HTMLItem or HTMLWord.
+
+        Returns:
+            int: Combination of the FORMAT_* flags.
+        """
+        return FormatAnalyzer.get_format_info(obj)[1]
+
+    @staticmethod
+    def has_format(obj, flag):
+        """
+        Check if the text of an HTMLItem or HTMLWord has the given format.
+
+        Args:
+            obj: An HTMLItem or HTMLWord.
+            flag (int): One of the FORMAT_* flags.
+
+        Returns:
+            bool: True if the text has the format, False otherwise.
+        """
+        return (FormatAnalyzer.get_format_info(obj)[1] & flag) != 0
+
+    @staticmethod
+    def get_year(obj):
+        """
+        Get the year of an HTMLItem or HTMLWord, as returned by to_year.
+
+        Args:
+            obj: An HTMLItem or HTMLWord.
+
+        Returns:
+            int or None: The converted year, or None if the text does not look like a year.
+        """
+        return FormatAnalyzer.get_format_info(obj)[2]
+
+    @staticmethod
+    def get_number(obj):
+        """
+        Get the number of an HTMLItem or HTMLWord, as returned by to_float_number.
+
+        Args:
+            obj: An HTMLItem or HTMLWord.
+
+        Returns:
+            float or None: The converted number, or None if the text does not look numeric.
+        """
+        return FormatAnalyzer.get_format_info(obj)[3]
+
     @staticmethod
     def looks_footnote(val):
         """
@@ -7,10 +7,12 @@
 # Note   : 1 HTMLPage consists of 1 HTMLCluster (root-node)
 # Note   : 1 HTMLCluster contains * HTMLClusters (internal nodes), or consists of 1 HTMLItem (leaf node)
 # ============================================================================================================================
+import heapq
 import numpy
 import scipy.cluster.hierarchy as hcl
+import config_for_rb
 from globals import hsv_to_rgba, dist, print_verbose
-from scipy.spatial.distance import squareform
+from scipy.spatial.distance import pdist
 
 CLUSTER_DISTANCE_MODE_EUCLIDIAN = 0
 CLUSTER_DISTANCE_MODE_RAW_TEXT = 1
@@ -27,6 +29,8 @@ class HTMLCluster:
         flat_text (str): The concatenated text of items within the cluster (used internally).
     """
 
+    __slots__ = ('idx', 'children', 'items', 'flat_text')
+
     def __init__(self):
         """
         Initializes an instance of the HTMLCluster class.
@@ -202,6 +206,64 @@ class HTMLCluster:
 
         raise ValueError('Invalid distance mode')
 
+    @staticmethod
+    def average_linkage_1d(values):
+        """
+        Average linkage for 1-dimensional values, with the same output format as scipy's hcl.linkage.
+        If the values are sorted, each cluster is an interval, and the average distance of two clusters is just the
+        distance of their means. Neighbouring intervals are always closer than any other ones, so only these have to
+        be considered. Takes O(n log n) time and O(n) memory, instead of O(n^2).
+        Note: If several neighbouring intervals have the same distance, they may be merged in a different order than by
+        hcl.linkage, so in case of such ties the resulting tree can differ from scipy's. Without ties, it is identical.
+
+        Args:
+            values (numpy.ndarray): One value for each item.
+
+        Returns:
+            numpy.ndarray: Linkage matrix, each row is (cluster_a, cluster_b, distance, number of items).
+        """
+        n = len(values)
+        order = numpy.argsort(values, kind='stable')
+        # intervals, as a doubly linked list over positions in order. an interval is referred to by its first position
+        node_id = order.tolist()  # cluster id (like in linkage matrix)
+        sums = values[order].tolist()
+        counts = [1] * n
+        left = list(range(-1, n - 1))
+        right = list(range(1, n + 1))
+        right[n - 1] = -1
+        version = [0] * n  # to detect outdated heap entries
+
+        def gap(p):  # distance between interval p and its right neighbour
+            q = right[p]
+            return sums[q] / counts[q] - sums[p] / counts[p]
+
+        heap = [(gap(p), p, 0) for p in range(n - 1)]
+        heapq.heapify(heap)
+        res = numpy.zeros((n - 1, 4))
+        for k in range(n - 1):
+            while True:
+                d, p, v = heapq.heappop(heap)
+                if version[p] == v:
+                    break
+            q = right[p]
+            a, b = node_id[p], node_id[q]
+            res[k] = (min(a, b), max(a, b), d, counts[p] + counts[q])
+            # merge q into p
+            node_id[p] = n + k
+            sums[p] += sums[q]
+            counts[p] += counts[q]
+            right[p] = right[q]
+            if right[p] != -1:
+                left[right[p]] = p
+            version[p] += 1
+            version[q] += 1  # q does not exist anymore
+            if right[p] != -1:
+                heapq.heappush(heap, (gap(p), p, version[p]))
+            if left[p] != -1:
+                version[left[p]] += 1
+                heapq.heappush(heap, (gap(left[p]), left[p], version[left[p]]))
+        return res
+
     @staticmethod
     def generate_clusters(items, mode):
         """
@@ -215,7 +277,8 @@ class HTMLCluster:
             mode (int): Distance calculation mode.
 
         Returns:
-            HTMLCluster: The root cluster node.
+            HTMLCluster: The root cluster node. In EUCLIDIAN mode, if there are more than
+                global_max_cluster_items_euclidian items, all items are direct children of it (flat cluster).
         """
         print_verbose(3, "Regenerating clusters")
 
@@ -231,22 +294,27 @@ class HTMLCluster:
             cur.idx = it.this_id
             nodes.append(cur)
 
-        print_verbose(3, 'Leaves: ' + str(nodes))
-
-        # generate distance matrix
-        l = len(items)
-        dmatrix = numpy.zeros((l, l))
-        for i in range(l):
-            for j in range(i + 1, l):
-                d = HTMLCluster.item_dist(items[i], items[j], mode)
-                dmatrix[i, j] = d
-                dmatrix[j, i] = d
+        if config_for_rb.global_verbosity >= 3:  # str(nodes) is expensive
+            print_verbose(3, 'Leaves: ' + str(nodes))
 
-        print_verbose(5, dmatrix)
+        if mode == CLUSTER_DISTANCE_MODE_EUCLIDIAN and len(items) > config_for_rb.global_max_cluster_items_euclidian:
+            # the condensed distance matrix would need too much memory (n*(n-1)/2 values)
+            print_verbose(1, 'Warning: Too many items (' + str(len(items)) + ') for euclidian clustering '
+                             '(see global_max_cluster_items_euclidian). Using a flat cluster instead')
+            res = HTMLCluster()
+            res.children = nodes
+            res.regenerate_not_exported(items)
+            return res
 
-        # Compute agglomerative cluster, from distance matrix
-        sq = squareform(dmatrix)
-        output_linkage = hcl.linkage(sq, method='average')
+        # compute agglomerative cluster
+        if mode == CLUSTER_DISTANCE_MODE_EUCLIDIAN:
+            # condensed distance matrix (same as item_dist, for all pairs i<j)
+            centers = numpy.array([it.get_rect().get_center() for it in items], dtype=float)
+            output_linkage = hcl.linkage(pdist(centers), method='average')
+        elif mode == CLUSTER_DISTANCE_MODE_RAW_TEXT:
+            output_linkage = HTMLCluster.average_linkage_1d(numpy.array([it.pos_y for it in items], dtype=float))
+        else:
+            raise ValueError('Invalid distance mode')
 
         # build up tree
         num_rows = numpy.size(output_linkage, 0)
@@ -261,6 +329,7 @@ class HTMLCluster:
         res = nodes[len(nodes) - 1]
         res.regenerate_not_exported(items)
 
-        print_verbose(3, 'Clustering result: ' + str(res))
+        if config_for_rb.global_verbosity >= 3:
+            print_verbose(3, 'Clustering result: ' + str(res))
 
         return res
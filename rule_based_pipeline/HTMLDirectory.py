@@ -8,6 +8,7 @@
 # Note   : 1 HTMLDirectory corresponds to 1 PDF-File
 # ============================================================================================================================
 from HTMLPage import HTMLPage
+from HTMLTable import HTMLTable
 from glob import glob
 from globals import config_for_rb, get_html_out_dir, print_verbose, remove_trailing_slash
 from os import system
@@ -112,6 +113,7 @@ class HTMLDirectory:
 
         # Read the PDF filename from the info.txt file in the HTML directory
         self.read_pdf_filename(html_dir)
+        HTMLTable.reset_overlapping_solver_stats()
 
         # Iterate through HTML files in the specified directory
         for file in glob(pathname):
@@ -127,6 +129,8 @@ class HTMLDirectory:
             # Append the HTMLPage object to the list of HTML pages
             self.htmlpages.append(htmlpage)
 
+        print_verbose(2, 'Overlapping special items solver stats: ' + str(HTMLTable.overlapping_solver_stats))
+
     def render_to_png(self, base_dir, out_dir):
         """
         Converts HTMLPages into PNGs.
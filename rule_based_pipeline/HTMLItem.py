@@ -9,7 +9,7 @@
 # ============================================================================================================================
 from FormatAnalyzer import FormatAnalyzer
 from config_for_rb import global_verbosity
-from globals import ALIGN_LEFT, CAT_DEFAULT, ALIGN_RIGHT, ALIGN_CENTER
+from globals import ALIGN_LEFT, CAT_DEFAULT, ALIGN_RIGHT, ALIGN_CENTER, FORMAT_NUMERIC
 from Rect import Rect
 
 
@@ -44,8 +44,14 @@ class HTMLItem:
         has_been_split (bool): Indicates if the item has been split.
         rendering_color (tuple): The rendering color in RGBA format. used only for PNG rendering. not related with KPI extraction
         page_num (int): The page number.
+        format_info (tuple): Cached classification of txt (see FormatAnalyzer.get_format_info). None if not yet computed
     """
 
+    __slots__ = ('line_num', 'tot_line_num', 'pos_x', 'pos_y', 'width', 'height', 'initial_height', 'font_size', 'txt',
+                 'is_bold', 'brightness', 'alignment', 'font_file', 'this_id', 'next_id', 'prev_id', 'category',
+                 'temp_assignment', 'merged_list', 'words', 'space_width', 'has_been_split', 'left_id', 'right_id',
+                 'rendering_color', 'page_num', 'format_info')
+
     def __init__(self):
         """
         Initializes an instance of the HTMLItem class.
@@ -78,6 +84,7 @@ class HTMLItem:
         self.right_id = -1
         self.rendering_color = (0, 0, 0, 255)  # black by default
         self.page_num = -1
+        self.format_info = None
 
     def get_depth(self):
         """
@@ -152,6 +159,9 @@ class HTMLItem:
         Returns:
             HTMLItem: The found item or None if not found.
         """
+        # normally, the id of an item is identical with its index in the list
+        if 0 <= item_id < len(items) and items[item_id].this_id == item_id:
+            return items[item_id]
         for it in items:
             if it.this_id == item_id:
                 return it
@@ -194,8 +204,8 @@ class HTMLItem:
             and self.pos_x == it.pos_x \
             and self.font_file == it.font_file \
             and self.height == it.height \
-            and not FormatAnalyzer.looks_numeric(self.txt) \
-            and not FormatAnalyzer.looks_numeric(it.txt)
+            and not FormatAnalyzer.has_format(self, FORMAT_NUMERIC) \
+            and not FormatAnalyzer.has_format(it, FORMAT_NUMERIC)
 
     def is_weakly_mergable_after_reconnect(self, it):
         """
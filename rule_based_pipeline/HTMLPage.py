@@ -9,6 +9,7 @@
 # Note   : 1 HTMLPage consistens of * HTMLCluster
 # Note   : 1 HTMLDirectory consistens of * HTMLPages
 # ============================================================================================================================
+import bisect
 import copy
 import jsonpickle
 import html
@@ -26,15 +27,33 @@ from Rect import Rect
 
 
 class HTMLPage:
+    class SplitChain:  # items that have been split from one original item (linked by left_id / right_id)
+        first_idx = None  # the left-most item
+        idx_list = None  # all items, from left to right
+        txt = None  # txt of all items, joined by ' '
+        rect = None  # bounding rect of all items
+
+        def __init__(self, idx_list, items):
+            self.first_idx = idx_list[0]
+            self.idx_list = idx_list
+            self.txt = ' '.join(items[idx].txt for idx in idx_list)
+            self.rect = Rect(9999999, 9999999, -1, -1)
+            for idx in idx_list:
+                self.rect.grow(items[idx].get_rect())
+
+        def __repr__(self):
+            return '<idx_list=' + str(self.idx_list) + ', txt=' + str(self.txt) + '>'
+
     page_num = None
     page_width = None
     page_height = None
     items = None
+    split_chains = None  # dont export. maps index in items -> SplitChain. built on first use
     left_distrib = None  # distribution of pos_x values (left alignments)
     tables = None
     paragraphs = None
-    clusters = None
-    clusters_text = None  # clusters for traversing raw text
+    clusters = None  # generated on first use, see get_clusters
+    clusters_text = None  # clusters for traversing raw text. generated on first use, see get_clusters_text
     footnotes_idx = None
     page_start_y0 = None
 
@@ -46,8 +65,8 @@ class HTMLPage:
         self.left_distrib = {}
         self.tables = []
         self.paragraphs = []
-        self.clusters = []
-        self.clusters_text = []
+        self.clusters = None
+        self.clusters_text = None
         self.footnotes_idx = []
         self.page_start_y0 = [0]
 
@@ -108,6 +127,7 @@ class HTMLPage:
 
         for t in p1c.tables:
             t.recalc_geometry()
+        p0c.split_chains = None  # item ids have changed
 
         p0c.tables.extend(p1c.tables)
         p0c.find_paragraphs()
@@ -115,10 +135,29 @@ class HTMLPage:
         for idx in p1c.footnotes_idx:
             p0c.footnotes_idx.append(idx + p0c_num_items)
 
-        p0c.generate_clusters()
+        # clusters of p0 are not valid anymore. they will be generated on first use
+        p0c.clusters = None
+        p0c.clusters_text = None
 
         return p0c
 
+    # =====================================================================================================================
+    # Utilities for Checking Item Ids
+    # =====================================================================================================================
+
+    def check_item_ids(self):
+        """
+        Asserts that the id of each HTMLItem is its index in self.items (links between items are followed by
+        self.items[id]), and that all links (next_id, prev_id, left_id, right_id) point to existing items.
+        Only used in debug mode.
+        """
+        for i in range(len(self.items)):
+            it = self.items[i]
+            assert it.this_id == i, 'Stale item id ' + str(it.this_id) + ' at index ' + str(i) + ': ' + str(it)
+            for link_id in (it.next_id, it.prev_id, it.left_id, it.right_id):
+                assert link_id == -1 or 0 <= link_id < len(self.items), 'Stale link ' + str(link_id) + ' in ' + str(
+                    it)
+
     # =====================================================================================================================
     # Utilities for Identifying Basic Structures
     # =====================================================================================================================
@@ -178,13 +217,13 @@ class HTMLPage:
                 if use_alignment == ALIGN_LEFT and abs(x0 - x0_0) < threshold:
                     # we found a left-aligned word
                     res.append(k)
-                    is_numeric = is_numeric or FormatAnalyzer.looks_weak_numeric(
-                        self.items[item_id].words[word_id].txt)
+                    is_numeric = is_numeric or FormatAnalyzer.has_format(
+                        self.items[item_id].words[word_id], FORMAT_WEAK_NUMERIC)
                 elif use_alignment == ALIGN_RIGHT and abs(x1 - x1_0) < threshold:
                     # we found a right-aligned word
                     res.append(k)
-                    is_numeric = is_numeric or FormatAnalyzer.looks_weak_numeric(
-                        self.items[item_id].words[word_id].txt)
+                    is_numeric = is_numeric or FormatAnalyzer.has_format(
+                        self.items[item_id].words[word_id], FORMAT_WEAK_NUMERIC)
                 # elif(x0 < x1_0 and x1 > x0_0):
                 elif ((x0 < x0_0 < x1 and use_alignment == ALIGN_LEFT) or (
                         x0 < x1_0 < x1 and use_alignment == ALIGN_RIGHT)):
@@ -244,11 +283,11 @@ class HTMLPage:
 
             # Check if HTMLWord (BBox) and left and right adjacent have at least one 
             # number in text.
-            isnum = FormatAnalyzer.looks_weak_numeric(self.items[item_id].words[word_id].txt)
-            isnum_l = FormatAnalyzer.looks_weak_numeric(
-                self.items[item_id].words[word_id - 1].txt) if word_id > 0 else False
-            isnum_r = FormatAnalyzer.looks_weak_numeric(
-                self.items[item_id].words[word_id + 1].txt) if word_id < num_words - 1 else False
+            isnum = FormatAnalyzer.has_format(self.items[item_id].words[word_id], FORMAT_WEAK_NUMERIC)
+            isnum_l = FormatAnalyzer.has_format(
+                self.items[item_id].words[word_id - 1], FORMAT_WEAK_NUMERIC) if word_id > 0 else False
+            isnum_r = FormatAnalyzer.has_format(
+                self.items[item_id].words[word_id + 1], FORMAT_WEAK_NUMERIC) if word_id < num_words - 1 else False
 
             # left-aligned words:
             # print("L")
@@ -333,8 +372,8 @@ class HTMLPage:
 
             if (self.items[ij[0]].words[ij[1]].rect.x0 - self.items[ij[0]].words[ij[1] - 1].rect.x1 < self.items[
                 item_id].space_width * 1.5 and
-                    not FormatAnalyzer.looks_weak_numeric(self.items[ij[0]].words[ij[1]].txt) and
-                    not FormatAnalyzer.looks_weak_numeric(self.items[ij[0]].words[ij[1] - 1].txt)):
+                    not FormatAnalyzer.has_format(self.items[ij[0]].words[ij[1]], FORMAT_WEAK_NUMERIC) and
+                    not FormatAnalyzer.has_format(self.items[ij[0]].words[ij[1] - 1], FORMAT_WEAK_NUMERIC)):
                 continue  # words are too close to split
 
             print_verbose(3, '---> Split item ' + str(self.items[ij[0]]) + ' at word ' + \
@@ -347,6 +386,42 @@ class HTMLPage:
 
             next_id += 1
 
+        self.split_chains = None
+
+    def build_split_chains(self):
+        """Builds the SplitChain for each HTMLItem, i.e. follows the left_id / right_id links once.
+           Must be called again (or split_chains be reset to None) if links or texts of items change.
+        """
+        self.split_chains = [None] * len(self.items)
+        for i in range(len(self.items)):
+            if self.split_chains[i] is not None:
+                continue
+            # if an item has been split more than once, left_id can skip items (it still refers to the original
+            # item), but right_id never does. so we go to the left-most item, and then follow right_id only
+            idx = i
+            while self.items[idx].left_id != -1:
+                idx = self.items[idx].left_id
+            idx_list = []
+            while idx != -1:
+                idx_list.append(idx)
+                idx = self.items[idx].right_id
+            chain = HTMLPage.SplitChain(idx_list, self.items)
+            for idx in idx_list:
+                self.split_chains[idx] = chain
+
+    def get_split_chain(self, idx):
+        """Gets the SplitChain that HTMLItem idx belongs to.
+
+        Args:
+            idx (int): Index of HTMLItem.
+
+        Returns:
+            SplitChain: The chain (for items that have not been split, it contains only idx).
+        """
+        if self.split_chains is None:
+            self.build_split_chains()
+        return self.split_chains[idx]
+
     def get_txt_unsplit(self, idx):
         """Gets text of adjacent HTMLItems.
 
@@ -356,9 +431,10 @@ class HTMLPage:
         Returns:
             str: Text on adjacent HTMLItems.
         """
-        if self.items[idx].right_id == -1:
-            return self.items[idx].txt
-        return self.items[idx].txt + " " + self.get_txt_unsplit(self.items[idx].right_id)
+        chain = self.get_split_chain(idx)
+        if chain.first_idx == idx:
+            return chain.txt
+        return ' '.join(self.items[i].txt for i in chain.idx_list[chain.idx_list.index(idx):])
 
     def find_left_distributions(self):
         """Counts the number of (left/first) X-Coordinates of HTMLItems (Div Containers).
@@ -398,24 +474,26 @@ class HTMLPage:
                     res.append(i)
         return res
 
-    def explode_item(self, idx, sep=' '):  # return concatenated txt
-        def expl_int(dir, idx, sep):
-            return (
-                       '' if self.items[idx].left_id == -1 or dir > 0 else expl_int(-1, self.items[idx].left_id,
-                                                                                    sep) + sep) + \
-                   self.items[idx].txt + \
-                   ('' if self.items[idx].right_id == -1 or dir < 0 else sep + expl_int(1, self.items[idx].right_id,
-                                                                                        sep))
+    def get_item_rect(self, idx):
+        """
+        Gets the rect of an HTMLItem (see also HTMLPageView.get_item_rect).
 
-        return expl_int(0, idx, sep)
+        Args:
+            idx (int): Index of HTMLItem.
 
-    def explode_item_by_idx(self, idx):  # return list of idx
-        def expl_int(dir, idx):
-            return ([] if self.items[idx].left_id == -1 or dir > 0 else expl_int(-1, self.items[idx].left_id)) + \
-                   [idx] + \
-                   ([] if self.items[idx].right_id == -1 or dir < 0 else expl_int(1, self.items[idx].right_id))
+        Returns:
+            Rect: The rect.
+        """
+        return self.items[idx].get_rect()
 
-        return expl_int(0, idx)
+    def explode_item(self, idx, sep=' '):  # return concatenated txt
+        chain = self.get_split_chain(idx)
+        if sep == ' ':
+            return chain.txt
+        return sep.join(self.items[i].txt for i in chain.idx_list)
+
+    def explode_item_by_idx(self, idx):  # return list of idx
+        return self.get_split_chain(idx).idx_list.copy()
 
     def find_vertical_aligned_items(self, item, alignment, threshold):
         """
@@ -504,6 +582,16 @@ class HTMLPage:
         for it in self.items:
             it.temp_assignment = 0
 
+    def clear_temp_assignments(self, idx_list):
+        """
+        Removes the temporary assignments from the given HTMLItems (Div Containers) only.
+
+        Args:
+            idx_list (list): Indices of HTMLItems.
+        """
+        for i in idx_list:
+            self.items[i].temp_assignment = 0
+
     def guess_all_alignments(self):
         """
         Esimates the vertical alignments HTMLItems (Div Containers) on the HTMLPage.
@@ -522,18 +610,58 @@ class HTMLPage:
             else:
                 it.alignment = ALIGN_CENTER
 
-    def find_next_nonclassified_item(self):
+    def find_next_nonclassified_item(self, start_idx=0):
         """
         Searches HTMLItems (Div Container) that is not assigned a category.
 
+        Args:
+            start_idx (int): All HTMLItems before this index are known to be classified.
+
         Returns:
             HTMLItem: HTMLItem without category.
         """
-        for it in self.items:
-            if not it.has_category():
-                return it
+        for i in range(start_idx, len(self.items)):
+            if not self.items[i].has_category():
+                return self.items[i]
         return None
 
+    def group_items_by_pos_x(self):
+        """
+        Groups all HTMLItems (Div Containers) by their x-coordinate.
+
+        Returns:
+            list: All distinct x-coordinates, sorted ascending.
+            dict: For each x-coordinate, the indices of all items at that position (ascending).
+        """
+        groups = {}
+        for i in range(len(self.items)):
+            groups.setdefault(self.items[i].pos_x, []).append(i)
+        return sorted(groups), groups
+
+    @staticmethod
+    def find_items_in_column(xs, groups, x0, x1, min_idx=0):
+        """
+        Finds all items with x0 <= pos_x <= x1, using the result of group_items_by_pos_x.
+
+        Args:
+            xs (list): Sorted x-coordinates.
+            groups (dict): Item indices for each x-coordinate.
+            x0 (float): Left boundary of the column.
+            x1 (float): Right boundary of the column.
+            min_idx (int): Only items with an index >= min_idx are returned.
+
+        Returns:
+            list: Indices of the found items, sorted ascending (i.e., in the order of self.items).
+        """
+        res = []
+        for k in range(bisect.bisect_left(xs, x0), bisect.bisect_right(xs, x1)):
+            res.extend(groups[xs[k]])
+        if x1 > x0:
+            res.sort()
+        if min_idx > 0:
+            res = res[bisect.bisect_left(res, min_idx):]
+        return res
+
     def identify_connected_txt_lines(self):
         """
         Determines which HTMLItems (Div Containers) are connected to each other.
@@ -571,6 +699,7 @@ class HTMLPage:
 
         threshold = int(0.03 * self.page_width + 0.5)  # allow max 3% deviation to the left
         cur_threshold = 0
+        xs, groups = self.group_items_by_pos_x()
 
         # For each x_pos, cnt of HTMLItems (Div Container) in HTMLPage
         # Hence this dict can be interpreted as columns. 
@@ -582,8 +711,8 @@ class HTMLPage:
             # For each line in this column, store its y position
             cur_lines = {}
             last_pos_y = -1
-            for i in range(len(self.items)):
-                if cur_x <= self.items[i].pos_x <= cur_x + cur_threshold and self.items[i].pos_y > last_pos_y:
+            for i in HTMLPage.find_items_in_column(xs, groups, cur_x, cur_x + cur_threshold):
+                if self.items[i].pos_y > last_pos_y:
                     cur_lines[i] = self.items[i].pos_y
                     last_pos_y = self.items[i].pos_y + self.items[i].height * 0.9
 
@@ -636,15 +765,19 @@ class HTMLPage:
             if it.prev_id != -1:
                 continue  # has previous item => we look at that
 
-            txt = FormatAnalyzer.trim_whitespaces(it.txt)
+            if it.next_id == -1:
+                is_running_text = FormatAnalyzer.has_format(it, FORMAT_RUNNING_TEXT)  # single item
+            else:
+                txt = FormatAnalyzer.trim_whitespaces(it.txt)
 
-            next = it.next_id
-            while (next != -1):
-                # print(self.items[next], self.items[next].next_id)
-                txt += ' ' + FormatAnalyzer.trim_whitespaces(self.items[next].txt)
-                next = self.items[next].next_id
+                next = it.next_id
+                while (next != -1):
+                    # print(self.items[next], self.items[next].next_id)
+                    txt += ' ' + FormatAnalyzer.trim_whitespaces(self.items[next].txt)
+                    next = self.items[next].next_id
+                is_running_text = FormatAnalyzer.looks_running_text(txt)
 
-            if (FormatAnalyzer.looks_running_text(txt)):
+            if is_running_text:
                 it.category = CAT_RUNNING_TEXT
                 next = it.next_id
                 while (next != -1):
@@ -657,14 +790,14 @@ class HTMLPage:
         """
 
         threshold = int(0.03 * self.page_width + 0.5)  # allow max 3% deviation to the left
+        xs, groups = self.group_items_by_pos_x()
 
         for cur_x, cnt in self.left_distrib.items():
 
             cur_lines = {}  # for each line in this column, we store its y position
-            cur_threshold = 0
-            for i in range(len(self.items)):
-                if cur_x <= self.items[i].pos_x <= cur_x + cur_threshold:
-                    cur_threshold = threshold
+            # the column starts at the first item exactly at cur_x, from there on we allow the deviation "threshold"
+            if cur_x in groups:
+                for i in HTMLPage.find_items_in_column(xs, groups, cur_x, cur_x + threshold, groups[cur_x][0]):
                     cur_lines[i] = self.items[i].pos_y
 
             cur_lines = sorted(cur_lines.items(), key=lambda kv: kv[1])
@@ -717,7 +850,7 @@ class HTMLPage:
                 if self.items[cur_item_id].next_id != -1 or self.items[cur_item_id].prev_id == -1:
                     continue  # we are only interested at items that mark end of a block
 
-                if not FormatAnalyzer.looks_words(self.items[cur_item_id].txt):
+                if not FormatAnalyzer.has_format(self.items[cur_item_id], FORMAT_WORDS):
                     continue  # only text
 
                 print_verbose(9,
@@ -778,22 +911,45 @@ class HTMLPage:
         # Isolated items
         iso_threshold = 0.05 * self.page_height
 
+        def is_neighbour_candidate(jt):
+            # we do not consider these ones (=> text is assumed to be isolated, even if any of these ones are near)
+            return not (jt.category == CAT_RUNNING_TEXT or jt.category == CAT_HEADLINE or
+                        jt.category == CAT_OTHER_TEXT or jt.category == CAT_FOOTER)
+
+        # put all candidates into a grid with cell size iso_threshold, so that we only need to look at the cells
+        # around an item in order to find all other items within a distance of iso_threshold
+        cell_size = max(iso_threshold, 1.0)
+
+        def grid_range(x0, y0, x1, y1):
+            for gx in range(int(x0 // cell_size), int(x1 // cell_size) + 1):
+                for gy in range(int(y0 // cell_size), int(y1 // cell_size) + 1):
+                    yield gx, gy
+
+        grid = {}
+        for jt in self.items:
+            if is_neighbour_candidate(jt):
+                for cell in grid_range(jt.pos_x, jt.pos_y, jt.pos_x + jt.width, jt.pos_y + jt.height):
+                    grid.setdefault(cell, []).append(jt)
+
         for it in self.items:
             if (it.category != CAT_DEFAULT):
                 continue  # already taken
 
-            min_dist = 99999999
-
-            for jt in self.items:
-                if (
-                        it == jt or jt.category == CAT_RUNNING_TEXT or jt.category == CAT_HEADLINE or jt.category == CAT_OTHER_TEXT or jt.category == CAT_FOOTER):
-                    continue  # we do not consider these ones (=> text is assumed to be isolated, even if any of these ones are near)
-                cur_dist = Rect.raw_rect_distance(it.pos_x, it.pos_y, it.pos_x + it.width, it.pos_y + it.height,
-                                                  jt.pos_x, jt.pos_y, jt.pos_x + jt.width, jt.pos_y + jt.height)
-                if (cur_dist < min_dist):
-                    min_dist = cur_dist
+            is_isolated = True
+            for cell in grid_range(it.pos_x - iso_threshold, it.pos_y - iso_threshold,
+                                   it.pos_x + it.width + iso_threshold, it.pos_y + it.height + iso_threshold):
+                for jt in grid.get(cell, []):
+                    if it == jt or not is_neighbour_candidate(jt):  # categories may change within this loop
+                        continue
+                    cur_dist = Rect.raw_rect_distance(it.pos_x, it.pos_y, it.pos_x + it.width, it.pos_y + it.height,
+                                                      jt.pos_x, jt.pos_y, jt.pos_x + jt.width, jt.pos_y + jt.height)
+                    if (cur_dist <= iso_threshold):
+                        is_isolated = False
+                        break
+                if not is_isolated:
+                    break
 
-            if (min_dist > iso_threshold):
+            if (is_isolated):
                 print_verbose(10, "---->>> found CAT_OTHER_TEXT/5 for item " + str(it.this_id))
                 it.category = CAT_OTHER_TEXT
 
@@ -1056,64 +1212,132 @@ class HTMLPage:
 
         return []
 
-    def discover_table(self, initial_item):
+    def discover_table(self, initial_item, touched_idx=None, reclassified_idx=None):
         """
         Discovers HTMLTables in HTMLItems.
 
         Args:
             initial_item (HTMLItem): (Div Container) that is not assigned a category yet.
+            touched_idx (list, optional): Indices of all HTMLItems that got a temp. assignment by the previous call.
+                If given, only these are cleared (instead of all), and it will be filled with the indices of all
+                HTMLItems that got a temp. assignment by this call.
+            reclassified_idx (list, optional): If given, it will be extended by the indices of all HTMLItems whose
+                category has been reset (missing items of the table).
 
         Returns:
             HTMLTable: discovered HTMLTable object.
         """
         print_verbose(2, "DISCOVER NEW TABLE AT " + str(initial_item))
 
-        done = False
+        if touched_idx is None:
+            self.clear_all_temp_assignments()
+            touched_idx = []
+        else:
+            self.clear_temp_assignments(touched_idx)
+            touched_idx.clear()
 
-        while not done:
-            done = True
+        table = self.discover_whole_table(initial_item, touched_idx)
 
-            initial_item.temp_assignment = 0
-            self.clear_all_temp_assignments()
+        while table is not None and table.is_good_table():
+            # did we miss any items?
+            missing_items = self.find_items_within_rect(table.table_rect,
+                                                        [CAT_HEADLINE, CAT_OTHER_TEXT, CAT_RUNNING_TEXT,
+                                                         CAT_FOOTER])
+            if len(missing_items) == 0:
+                break
 
-            sub_tables = self.discover_subtables_recursively(initial_item, 0)
-            if len(sub_tables) == 0:
-                return None
+            # yes => reclassify
+            print_verbose(2, "Found missing items : " + str(missing_items))
+            for i in missing_items:
+                self.items[i].category = CAT_DEFAULT
+            if reclassified_idx is not None:
+                reclassified_idx.extend(missing_items)
+
+            table_idx = set(table.get_all_idx())
+            if any(i != -1 and i not in table_idx for i in touched_idx):
+                # cleanup_table has dropped items. these keep their temp. assignment, so they can't be merged into
+                # the existing table anymore => rediscover the whole table
+                self.clear_temp_assignments(touched_idx)
+                touched_idx.clear()
+                table = self.discover_whole_table(initial_item, touched_idx)
+                continue
 
-            table = sub_tables[0]
-            print_verbose(2, "Starting with table: " + str(sub_tables[0]))
+            # otherwise, grow the table by the sub-tables that can be discovered from the missing items.
+            # all other items keep their temp. assignment, so the existing table doesn't need to be rediscovered
+            new_sub_tables = []
+            for i in missing_items:
+                if i not in table_idx:
+                    self.items[i].temp_assignment = 0
+            for i in missing_items:
+                new_sub_tables.extend(self.discover_subtables_recursively(self.items[i], 0))
+            for sub_table in new_sub_tables:
+                touched_idx.extend(sub_table.idx.tolist())
+
+            if len(new_sub_tables) == 0:
+                continue
 
-            for i in range(1, len(sub_tables)):
-                print_verbose(5, "Merging table: " + str(sub_tables[i]))
-                table = HTMLTable.merge(table, sub_tables[i], self.page_width)
-                print_verbose(5, "Next table:" + str(table))
+            headline_idx = table.headline_idx
+            special_idx = table.special_idx
+            for sub_table in new_sub_tables:
+                print_verbose(5, "Merging table: " + str(sub_table))
+                table = HTMLTable.merge(table, sub_table, self.page_width)
+            table.headline_idx = headline_idx
+            table.special_idx = special_idx
+            print_verbose(5, "Grown table:" + str(table))
 
             table.cleanup_table(self.page_width, self.paragraphs)
 
-            if table.is_good_table():
-                # did we miss any items?
-                missing_items = self.find_items_within_rect(table.table_rect,
-                                                            [CAT_HEADLINE, CAT_OTHER_TEXT, CAT_RUNNING_TEXT,
-                                                             CAT_FOOTER])
-                if len(missing_items) > 0:
-                    # yes => reclassify
-                    print_verbose(2, "Found missing items : " + str(missing_items))
-                    for i in missing_items:
-                        self.items[i].category = CAT_DEFAULT
-                    done = False
+        return table
+
+    def discover_whole_table(self, initial_item, touched_idx):
+        """
+        Discovers all SubTables from "initial_item", merges and cleans them up (see discover_table).
+
+        Args:
+            initial_item (HTMLItem): (Div Container) that is not assigned a category yet.
+            touched_idx (list): Will be extended by the indices of all HTMLItems that got a temp. assignment.
 
+        Returns:
+            HTMLTable: discovered HTMLTable object, or None if there is none.
+        """
+        initial_item.temp_assignment = 0
+
+        sub_tables = self.discover_subtables_recursively(initial_item, 0)
+        for sub_table in sub_tables:
+            touched_idx.extend(sub_table.idx.tolist())
+        if len(sub_tables) == 0:
+            return None
+
+        table = sub_tables[0]
+        print_verbose(2, "Starting with table: " + str(sub_tables[0]))
+
+        for i in range(1, len(sub_tables)):
+            print_verbose(5, "Merging table: " + str(sub_tables[i]))
+            table = HTMLTable.merge(table, sub_tables[i], self.page_width)
+            print_verbose(5, "Next table:" + str(table))
+
+        table.cleanup_table(self.page_width, self.paragraphs)
         return table
 
     def mark_all_tables(self):
         """
         Marks and groups HTMLItems (Div Container) as HTMLTable
         """
+        self.split_chains = None  # items in tables can be merged, and their txt changes
+        # all items before next_idx are classified. only items touched or reclassified by discover_table (missing
+        # items of a table) can lose their category, so only these can move next_idx back
+        next_idx = 0
+        touched_idx = []
+        reclassified_idx = []
+        self.clear_all_temp_assignments()
         while True:
-            next = self.find_next_nonclassified_item()
+            next = self.find_next_nonclassified_item(next_idx)
             if next is None:
                 break  # we are done
+            next_idx = next.this_id
 
-            table = self.discover_table(next)
+            reclassified_idx.clear()
+            table = self.discover_table(next, touched_idx, reclassified_idx)
             print_verbose(2, "FOUND TABLE: " + str(table))
             if config_for_rb.global_force_special_items_into_table:
                 table.force_special_items_into_table()
@@ -1126,6 +1350,10 @@ class HTMLPage:
                 print_verbose(2, "---> bad")
                 table.categorize_as_misc()
 
+            for i in touched_idx + reclassified_idx:
+                if 0 <= i < next_idx and not self.items[i].has_category():
+                    next_idx = i
+
         # sort out all empty special items
         for t in self.tables:
             tmp_sp_idx = []
@@ -1212,7 +1440,7 @@ class HTMLPage:
 
                 # text
         if RENDERING_USE_CLUSTER_COLORS:
-            self.clusters_text.generate_rendering_colors_rec()
+            self.get_clusters_text().generate_rendering_colors_rec()
 
         for it in self.items:
             font_color = (0, 0, 255, 255)  # default
@@ -1253,98 +1481,101 @@ class HTMLPage:
     # Clustering procedures
     # =====================================================================================================================
 
-    def generate_clusters(self):
+    def get_clusters(self):
         """
-        Generates hierarchical cluser of HTMLItems with different distance modes.
+        Gets the hierarchical cluster of HTMLItems by euclidian distance. It is generated on first use.
+
+        Returns:
+            HTMLCluster: Root node of the cluster.
+        """
+        if self.clusters is None:
+            self.clusters = HTMLCluster.generate_clusters(self.items, CLUSTER_DISTANCE_MODE_EUCLIDIAN)
+        return self.clusters
+
+    def get_clusters_text(self):
         """
-        self.clusters = HTMLCluster.generate_clusters(self.items, CLUSTER_DISTANCE_MODE_EUCLIDIAN)
-        self.clusters_text = HTMLCluster.generate_clusters(self.items, CLUSTER_DISTANCE_MODE_RAW_TEXT)
+        Gets the hierarchical cluster of HTMLItems for traversing raw text. It is generated on first use.
+
+        Returns:
+            HTMLCluster: Root node of the cluster.
+        """
+        if self.clusters_text is None:
+            self.clusters_text = HTMLCluster.generate_clusters(self.items, CLUSTER_DISTANCE_MODE_RAW_TEXT)
+        return self.clusters_text
 
     # =====================================================================================================================
     # Other procedures
     # =====================================================================================================================
 
-    def remove_certain_items(self, txt, threshold):  # they would confuse tables and are not needed
+    def remove_unwanted_items(self, txt, threshold):
         """
-        Remove char "txt" from HTMLItem (Div Container) if occurence > threshold.
+        Removes all HTMLItems (Div Containers) that would confuse the detection of tables and are not needed, in a
+        single filtering stage:
+            1. Flyspeck, i.e. items below a certain height.
+            2. Words equal to "txt" (e.g. dot leaders), if they occur at least "threshold" times on the page. Items
+               without any remaining words are removed.
+            3. Items whose boxes overlap with a preceding item.
+        All decisions are made first, then self.items is compacted and renumbered only once.
 
         Args:
-            txt (str): String to check.
-            threshold (int): Accepted number of occurences for "txt".
+            txt (str): Word to be removed.
+            threshold (int): Minimum number of occurences for "txt" on the page, before it will be removed.
         """
 
+        # 1. flyspeck
+        flyspeck_threshold = DEFAULT_FLYSPECK_HEIGHT * self.page_height
+        candidates = []
         count = 0
         for it in self.items:
-            for w in it.words:
-                if w.txt == txt:
-                    count += 1
-
-        # print('-->count: '+str(count))
-
-        if count >= threshold:
-            new_items = []
-            cur_id = 0
-            for it in self.items:
-                new_words = []
+            if it.height > flyspeck_threshold:
+                candidates.append(it)
                 for w in it.words:
-                    if w.txt != txt:
-                        w.item_id = cur_id
-                        new_words.append(w)
-                if len(new_words) == 0:
-                    continue  # skip this item
-
-                it.this_id = cur_id
-                it.words = new_words
-                it.recalc_geometry()
-                it.rejoin_words()
-                new_items.append(it)
-                cur_id += 1
-
-            self.items = new_items
-
-    def remove_flyspeck(self):
-        """
-        Removes HTMLItems (Div Containers) below a certain threshold. These are considered flyspeck.
-        """
-
-        threshold = DEFAULT_FLYSPECK_HEIGHT * self.page_height
-        new_items = []
-        cur_id = 0
-        for it in self.items:
-            if it.height > threshold:
-                it.this_id = cur_id
-                new_items.append(it)
-                cur_id += 1
+                    if w.txt == txt:
+                        count += 1
             else:
                 print_verbose(6, "Removing flyspeck item : " + str(it))
 
-        self.items = new_items
-
-    def remove_overlapping_items(self):
-        """
-        Remove HTMLItems (Div containers) with overlapping boxes
-        """
-
-        keep = [True] * len(self.items)
-
-        for i in range(len(self.items) - 1):
+        # 2. remove certain words
+        if count >= threshold:
+            remaining = []
+            for it in candidates:
+                new_words = [w for w in it.words if w.txt != txt]
+                if len(new_words) == 0:
+                    continue  # skip this item
+                for w in new_words:
+                    w.item_id = len(remaining)
+                if len(new_words) < len(it.words):
+                    it.words = new_words
+                    it.recalc_geometry()
+                    it.rejoin_words()
+                remaining.append(it)
+            candidates = remaining
+
+        for i in range(len(candidates)):
+            candidates[i].this_id = i
+
+        # 3. overlapping items
+        rects = [it.get_rect() for it in candidates]
+        keep = [True] * len(candidates)
+        for i in range(len(candidates) - 1):
             if keep[i]:
-                for j in range(i + 1, len(self.items)):
-                    if Rect.calc_intersection_area(self.items[i].get_rect(), self.items[j].get_rect()) > 0.:
+                ri = rects[i]
+                for j in range(i + 1, len(candidates)):
+                    if Rect.calc_intersection_area(ri, rects[j]) > 0.:
                         # overlapping items => remove it
                         keep[j] = False
-                        print_verbose(5, "Removing item : " + str(self.items[j]) + ", because overlap with : " + str(
-                            self.items[i]))
+                        print_verbose(5, "Removing item : " + str(candidates[j]) + ", because overlap with : " + str(
+                            candidates[i]))
 
-        new_items = []
-        cur_id = 0
-        for i in range(len(self.items)):
+        # compact and renumber
+        self.items = []
+        for i in range(len(candidates)):
             if keep[i]:
-                self.items[i].this_id = cur_id
-                new_items.append(self.items[i])
-                cur_id += 1
-
-        self.items = new_items
+                it = candidates[i]
+                it.this_id = len(self.items)
+                self.items.append(it)
+        if config_for_rb.global_debug_mode:
+            self.check_item_ids()
 
     def save_all_tables_to_csv(self, outdir):
         """
@@ -1379,9 +1610,7 @@ class HTMLPage:
         """
         Preprocesses raw data extracted from page
         """
-        self.remove_flyspeck()
-        self.remove_certain_items('.', 50)
-        self.remove_overlapping_items()
+        self.remove_unwanted_items('.', 50)
         self.detect_split_items()
         self.find_left_distributions()
         self.guess_all_alignments()
@@ -1391,7 +1620,8 @@ class HTMLPage:
         self.find_paragraphs()
         self.mark_all_tables()
         self.mark_all_footnotes()
-        self.generate_clusters()
+        if config_for_rb.global_debug_mode:
+            self.check_item_ids()
 
     def __repr__(self):
         res = "====>>> HTMLPage : No. = " + str(self.page_num) + ", Width = " + str(
@@ -1412,6 +1642,15 @@ class HTMLPage:
             res = res + t.get_printed_repr()
         return res
 
+    def reset_format_info(self):
+        """
+        Drops the cached text classification of all items and words (see FormatAnalyzer.get_format_info).
+        """
+        for it in self.items:
+            it.format_info = None
+            for w in it.words:
+                w.format_info = None
+
     def to_json(self):
         """
         Encodes a HTMLPage object into a JSON Format.
@@ -1420,7 +1659,10 @@ class HTMLPage:
             str: Encoded JSON data string.
         """
         for t in self.tables:
-            t.items = None
+            t.cleanup_for_export()
+        split_chains = self.split_chains
+        self.split_chains = None  # will be rebuilt on first use
+        self.reset_format_info()  # will be recomputed on first use
 
         if self.clusters is not None:
             self.clusters.cleanup_for_export()
@@ -1433,7 +1675,8 @@ class HTMLPage:
         data = jsonpickle.encode(self)
 
         for t in self.tables:
-            t.items = self.items
+            t.regenerate_not_exported(self.items)
+        self.split_chains = split_chains
 
         if self.clusters is not None:
             self.clusters.regenerate_not_exported(self.items)
@@ -1468,14 +1711,13 @@ class HTMLPage:
         obj = jsonpickle.decode(data)
 
         for t in obj.tables:
-            t.items = obj.items
+            t.regenerate_not_exported(obj.items)
+        obj.reset_format_info()  # not exported
 
-        # regenerate clusters, if they are not available
-        if obj.clusters is None or obj.clusters_text is None:
-            obj.generate_clusters()
-        else:
-            # just fill up clusters with missing values
+        # fill up clusters with missing values, if they are available. otherwise, they will be generated on first use
+        if obj.clusters is not None:
             obj.clusters.regenerate_not_exported(obj.items)
+        if obj.clusters_text is not None:
             obj.clusters_text.regenerate_not_exported(obj.items)
 
         return obj
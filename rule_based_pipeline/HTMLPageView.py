@@ -0,0 +1,190 @@
+# ============================================================================================================================
+# PDF_Analyzer
+# File   : HTMLPageView.py
+# Date   : 19.10.2026
+#
+# Note   : 1 HTMLPageView presents 2 subsequent HTMLPages as one page, without copying them
+# ============================================================================================================================
+import copy
+from Rect import Rect
+
+
+class HTMLPageView:
+    """
+    A virtual page, consisting of two subsequent HTMLPages (page1 is placed below page0). It is used instead of
+    HTMLPage.merge for analyzing multiple pages at once: The items, tables and split chains of both pages are shared,
+    and neither renumbered nor moved.
+
+    Items are indexed by the concatenation of both item lists, i.e. the items of page1 start at index
+    item_offset[1] = len(page0.items). In y-direction, page1 starts at page_start_y0[1] = page0.page_height.
+    The items and tables themselves keep the coordinates of their own page. Use get_item_rect resp. get_table_location
+    to map them to the coordinates of this view. As the tables are shared, AnalyzerTable never modifies them (it works
+    on copies of their rects, see AnalyzerTable.get_page_rect).
+
+    Compared to HTMLPage.merge, the same KPIs are found (with the same scores), but a KPI on the second page is reported
+    with the number of that page, its item id on that page and its position on that page (HTMLPage.merge reported the
+    first page, the renumbered id and the position on the merged page). KPIMeasure.remove_duplicates only compares
+    kpi_name and year, so the same KPIs are kept, only their reported location differs. Note, that AnalyzerDirectory
+    only creates a view if there is a table at the page break (see has_table_at_page_break).
+
+    Attributes:
+        pages (list): The two HTMLPages.
+        page_num (int): Page number of the first page.
+        page_width (float): Maximum width of both pages.
+        page_height (float): Total height of both pages.
+        page_start_y0 (list): For each page, the y-coordinate at which it starts.
+        item_offset (list): For each page, the index of its first item.
+        items (list): Items of both pages (references, not copies).
+        tables (list): Tables of both pages (shared with the pages, so they must not be modified).
+        clusters_text: Always None. Clusters are not available for views, they only exist for each page.
+    """
+
+    pages = None
+    page_num = None
+    page_width = None
+    page_height = None
+    page_start_y0 = None
+    item_offset = None
+    items = None
+    tables = None
+    clusters_text = None
+    split_chains = None  # index in items -> SplitChain (with indices and rect of this view). built on first use
+
+    def __init__(self, page0, page1):
+        """
+        Initializes an HTMLPageView.
+
+        Args:
+            page0 (HTMLPage): The first page.
+            page1 (HTMLPage): The subsequent page, which will be placed below page0.
+        """
+        self.pages = [page0, page1]
+        self.page_num = page0.page_num
+        self.page_width = max(page0.page_width, page1.page_width)
+        self.page_height = page0.page_height + page1.page_height
+        self.page_start_y0 = [0, page0.page_height]
+        self.item_offset = [0, len(page0.items)]
+        self.items = page0.items + page1.items
+        self.tables = page0.tables + page1.tables
+
+    @staticmethod
+    def has_table_at_page_break(page0, page1, margin):
+        """
+        Checks, if a table of page0 ends at its bottom, or a table of page1 starts at its top. Only then, analyzing both
+        pages at once can reveal more than analyzing them separately.
+
+        Args:
+            page0 (HTMLPage): The first page.
+            page1 (HTMLPage): The subsequent page.
+            margin (float): Maximum distance from the page break, as fraction of the page height.
+
+        Returns:
+            bool: True, if there is such a table.
+        """
+        for t in page0.tables:
+            if t.table_rect.y1 >= page0.page_height * (1.0 - margin):
+                return True
+        for t in page1.tables:
+            if t.table_rect.y0 <= page1.page_height * margin:
+                return True
+        return False
+
+    def get_page_of_item(self, idx):
+        """
+        Gets the page, on which an item is located.
+
+        Args:
+            idx (int): Index in items.
+
+        Returns:
+            int: 0 or 1.
+        """
+        return 1 if idx >= self.item_offset[1] else 0
+
+    def get_item_rect(self, idx):
+        """
+        Gets the rect of an item, in the coordinates of this view.
+
+        Args:
+            idx (int): Index in items.
+
+        Returns:
+            Rect: The rect.
+        """
+        rect = self.items[idx].get_rect()
+        offset_y = self.page_start_y0[self.get_page_of_item(idx)]
+        rect.y0 += offset_y
+        rect.y1 += offset_y
+        return rect
+
+    def get_table_location(self, table):
+        """
+        Gets the page of a table (or of a sub-table, see HTMLTable.generate_sub_tables) and its offsets in this view.
+
+        Args:
+            table (HTMLTable): The table.
+
+        Returns:
+            tuple: (page_num, item_offset, offset_y), i.e. the page number, the index of the first item of that page,
+                   and the y-coordinate at which that page starts.
+        """
+        for k in range(len(self.pages)):
+            if table.items is self.pages[k].items:
+                return self.pages[k].page_num, self.item_offset[k], self.page_start_y0[k]
+        raise ValueError('Table does not belong to any page of this view.')
+
+    def find_items_within_rect(self, rect, categories):  # returns list of indices
+        res = []
+        for k in range(len(self.pages)):
+            offset_y = self.page_start_y0[k]
+            page_rect = Rect(rect.x0, rect.y0 - offset_y, rect.x1, rect.y1 - offset_y)
+            res.extend(i + self.item_offset[k] for i in self.pages[k].find_items_within_rect(page_rect, categories))
+        return res
+
+    def get_split_chain(self, idx):
+        """Gets the SplitChain that HTMLItem idx belongs to, with indices and rect of this view.
+
+        Args:
+            idx (int): Index in items.
+
+        Returns:
+            SplitChain: The chain.
+        """
+        if self.split_chains is None:
+            self.split_chains = [None] * len(self.items)
+        if self.split_chains[idx] is None:
+            k = self.get_page_of_item(idx)
+            chain = self.pages[k].get_split_chain(idx - self.item_offset[k])
+            if k > 0:
+                # same chain, but moved to this view
+                chain = copy.copy(chain)
+                chain.first_idx += self.item_offset[k]
+                chain.idx_list = [i + self.item_offset[k] for i in chain.idx_list]
+                offset_y = self.page_start_y0[k]
+                chain.rect = Rect(chain.rect.x0, chain.rect.y0 + offset_y, chain.rect.x1, chain.rect.y1 + offset_y)
+            for i in chain.idx_list:
+                self.split_chains[i] = chain
+        return self.split_chains[idx]
+
+    def explode_item(self, idx, sep=' '):  # return concatenated txt
+        chain = self.get_split_chain(idx)
+        if sep == ' ':
+            return chain.txt
+        return sep.join(self.items[i].txt for i in chain.idx_list)
+
+    def get_clusters_text(self):
+        return None  # clusters are only available for each page
+
+    def transform_coords(self, x, y):
+        """
+        Transforms coordinates of this view into the [0,1) range of the page, on which they are located.
+
+        Args:
+            x (float): X-coordinate.
+            y (float): Y-coordinate.
+
+        Returns:
+            tuple: (x, y) on that page.
+        """
+        k = 1 if y >= self.page_start_y0[1] else 0
+        return self.pages[k].transform_coords(x, y - self.page_start_y0[k])
@@ -8,12 +8,11 @@
 # Note   : 1 HTMLPage consistens of * HTMLTables
 # ============================================================================================================================
 from ConsoleTable import ConsoleTable
-from copy import deepcopy
 from FormatAnalyzer import FormatAnalyzer
 from globals import *
 import math
+import numpy
 from Rect import Rect
-import time
 
 
 class HTMLTable:
@@ -22,24 +21,32 @@ class HTMLTable:
 
     rows = None
     cols = None
-    idx = None
+    idx = None  # numpy array (row-major, num_rows * num_cols) with index of item in each cell, or -1
     num_rows = None
     num_cols = None
     items = None  # dont export
-    marks = None
+    marks = None  # numpy array, same layout as idx
     col_aligned_pos_x = None
     headline_idx = None
     special_idx = None  # e.g., annotations
     table_rect = None
+    undo_log = None  # dont export. state of items before they were changed by cleanup_table
+    undo_merged_lists = None  # dont export. content of merged_lists before they were changed by cleanup_table
+    parent_table = None  # dont export. for sub-tables: the table, of which this table is a column range
+    parent_col0 = None  # for sub-tables: col in parent_table, that corresponds to col 0 of this table
+
+    # counters of identify_overlapping_special_items, summed up over all tables (not exported, as these are class-level).
+    # see reset_overlapping_solver_stats
+    overlapping_solver_stats = {'calls': 0, 'operations': 0, 'memo_hits': 0, 'budget_exhausted': 0}
 
     def __init__(self):
         self.rows = []
         self.cols = []
-        self.idx = []
+        self.idx = numpy.full(0, -1, dtype=int)
         self.items = []
         self.num_rows = 0
         self.num_cols = 0
-        self.marks = []
+        self.marks = numpy.zeros(0, dtype=int)
         self.col_aligned_pos_x = []
         self.headline_idx = []
         self.special_idx = []
@@ -52,7 +59,13 @@ class HTMLTable:
         return ix // self.num_cols, ix % self.num_cols
 
     def get_idx(self, i, j):  # i=row, j=col
-        return self.idx[i * self.num_cols + j]
+        return self.idx.item(i * self.num_cols + j)
+
+    def get_idx_grid(self):  # 2-D view (num_rows x num_cols) on idx. changes to the view will change idx
+        return self.idx.reshape(self.num_rows, self.num_cols)
+
+    def get_marks_grid(self):  # 2-D view (num_rows x num_cols) on marks
+        return self.marks.reshape(self.num_rows, self.num_cols)
 
     def get_item(self, i, j):  # i=row, j=col
         ix = self.get_idx(i, j)
@@ -61,36 +74,35 @@ class HTMLTable:
     def get_item_by_ix(self, i):  # i=ix
         if i < 0:
             return None
-        ix = self.idx[i]
-        return self.items[self.idx[i]] if ix >= 0 else None
+        ix = self.idx.item(i)
+        return self.items[ix] if ix >= 0 else None
 
     def has_item_at_ix(self, i):  # i=ix
         if i < 0:
             return False
-        return self.idx[i] >= 0
+        return self.idx.item(i) >= 0
 
     def has_item_at(self, i, j):  # i=row, j=col
-        return self.idx[i * self.num_cols + j] >= 0
+        return self.idx.item(i * self.num_cols + j) >= 0
 
     def has_non_empty_item_at(self, i, j):
         return self.has_item_at(i, j) and self.get_item(i, j).txt != ''
 
     def count_marks(self, mark):
-        return self.marks.count(mark)
+        return int(numpy.count_nonzero(self.marks == mark))
 
     def reset_marks(self):
-        for i in range(len(self.marks)):
-            self.marks[i] = 0 if self.idx[i] >= 0 else 9999999
+        self.marks = numpy.where(self.idx >= 0, 0, 9999999)
 
     def set_temp_assignment(self, value=1):
-        for i in self.idx:
+        for i in self.idx.tolist():
             self.items[i].temp_assignment = value
 
     def count_actual_items(self):
-        return len(self.idx) - self.idx.count(-1)
+        return int(numpy.count_nonzero(self.idx != -1))
 
     def get_all_idx(self):
-        return self.idx + self.headline_idx + self.special_idx
+        return self.idx.tolist() + self.headline_idx + self.special_idx
 
     def find_applying_special_item_ix(self, r0):
         # precondition : special_idx must be sorted pos_y ascending
@@ -143,12 +155,12 @@ class HTMLTable:
         num_words = 0
         for i in range(self.num_rows):
             if self.has_item_at(i, c0):
-                txt = self.get_item(i, c0).txt
-                # print(txt)
-                if FormatAnalyzer.looks_numeric(txt):
+                it = self.get_item(i, c0)
+                # print(it.txt)
+                if FormatAnalyzer.has_format(it, FORMAT_NUMERIC):
                     num_numbers += 1
                 # print('.. looks numeric')
-                elif FormatAnalyzer.looks_words(txt):
+                elif FormatAnalyzer.has_format(it, FORMAT_WORDS):
                     num_words += 1
                 # print('.. looks words')
         return num_words >= 5 and num_words > num_numbers * 0.3
@@ -168,12 +180,13 @@ class HTMLTable:
         self.col_aligned_pos_x = []
 
         table_rect = Rect(9999999, 9999999, -1, -1)
+        grid = self.get_idx_grid().tolist()
 
         # Calc table rect
         for i in range(self.num_rows):
             for j in range(self.num_cols):
-                if self.has_item_at(i, j):
-                    table_rect.grow(self.get_item(i, j).get_rect())
+                if grid[i][j] >= 0:
+                    table_rect.grow(self.items[grid[i][j]].get_rect())
 
         self.table_rect = table_rect
 
@@ -181,8 +194,8 @@ class HTMLTable:
         for i in range(self.num_rows):
             row_rect = Rect(table_rect.x0, 9999999, table_rect.x1, table_rect.y1)
             for j in range(self.num_cols):
-                if self.has_item_at(i, j):
-                    row_rect.y0 = min(row_rect.y0, self.get_item(i, j).pos_y)
+                if grid[i][j] >= 0:
+                    row_rect.y0 = min(row_rect.y0, self.items[grid[i][j]].pos_y)
             self.rows.append(row_rect)
             if i > 0:
                 self.rows[i - 1].y1 = max(row_rect.y0, self.rows[i - 1].y0 + 1)
@@ -191,8 +204,8 @@ class HTMLTable:
         for j in range(self.num_cols):
             col_rect = Rect(9999999, table_rect.y0, table_rect.x1, table_rect.y1)
             for i in range(self.num_rows):
-                if (self.has_item_at(i, j)):
-                    col_rect.x0 = min(col_rect.x0, self.get_item(i, j).pos_x)
+                if (grid[i][j] >= 0):
+                    col_rect.x0 = min(col_rect.x0, self.items[grid[i][j]].pos_x)
             self.cols.append(col_rect)
             if j > 0:
                 self.cols[j - 1].x1 = max(col_rect.x0, self.cols[j - 1].x0 + 1)
@@ -204,10 +217,10 @@ class HTMLTable:
             ctr_right = 0
             ctr_center = 0  # New-27.06.2022
             for i in range(self.num_rows):
-                if self.has_item_at(i, j):
-                    if self.get_item(i, j).alignment == ALIGN_LEFT:
+                if grid[i][j] >= 0:
+                    if self.items[grid[i][j]].alignment == ALIGN_LEFT:
                         ctr_left += 1
-                    elif self.get_item(i, j).alignment == ALIGN_RIGHT:
+                    elif self.items[grid[i][j]].alignment == ALIGN_RIGHT:
                         ctr_right += 1
                     else:
                         ctr_center += 1
@@ -225,16 +238,16 @@ class HTMLTable:
             ctr = 0
 
             for i in range(self.num_rows):
-                if self.has_item_at(i, j):
+                if grid[i][j] >= 0:
                     # New-27.06.2022
-                    # sum_align_pos_x += self.get_item(i, j).pos_x if col_alignment == ALIGN_LEFT else (self.get_item(i, j).pos_x + self.get_item(i, j).width)
+                    # sum_align_pos_x += self.items[grid[i][j]].pos_x if col_alignment == ALIGN_LEFT else (self.items[grid[i][j]].pos_x + self.items[grid[i][j]].width)
                     to_add = 0
                     if col_alignment == ALIGN_LEFT:
-                        to_add = self.get_item(i, j).pos_x
+                        to_add = self.items[grid[i][j]].pos_x
                     if col_alignment == ALIGN_RIGHT:
-                        to_add = self.get_item(i, j).pos_x + self.get_item(i, j).width
+                        to_add = self.items[grid[i][j]].pos_x + self.items[grid[i][j]].width
                     if col_alignment == ALIGN_CENTER:
-                        to_add = self.get_item(i, j).pos_x + self.get_item(i, j).width * 0.5
+                        to_add = self.items[grid[i][j]].pos_x + self.items[grid[i][j]].width * 0.5
                     sum_align_pos_x += to_add
 
                     ctr += 1
@@ -245,9 +258,8 @@ class HTMLTable:
         if r0 < -1 or r0 > self.num_rows:
             raise ValueError('Rows r0=' + str(r0) + ' out of range.')
 
-        c = self.num_cols
-        self.idx = self.idx[0:c * (r0 + 1)] + ([-1] * c) + self.idx[c * (r0 + 1):]
-        self.marks = self.marks[0:c * (r0 + 1)] + ([9999999] * c) + self.marks[c * (r0 + 1):]
+        self.idx = numpy.insert(self.get_idx_grid(), r0 + 1, -1, axis=0).ravel()
+        self.marks = numpy.insert(self.get_marks_grid(), r0 + 1, 9999999, axis=0).ravel()
         self.num_rows += 1
 
     def is_row_insertion_possible(self, r0, pos_y):  # can we insert row, starting at pos_y, right below r0?
@@ -268,8 +280,8 @@ class HTMLTable:
             raise ValueError('Rows r1=' + str(r1) + ' <= r0=' + str(r0))
 
         c = self.num_cols
-        self.idx = self.idx[0:c * r0] + self.idx[c * r1:]
-        self.marks = self.marks[0:c * r0] + self.marks[c * r1:]
+        self.idx = numpy.concatenate((self.idx[0:c * r0], self.idx[c * r1:]))
+        self.marks = numpy.concatenate((self.marks[0:c * r0], self.marks[c * r1:]))
         self.num_rows -= (r1 - r0)
         if (do_recalc_geometry):
             self.recalc_geometry()
@@ -282,15 +294,8 @@ class HTMLTable:
         if (c1 <= c0):
             raise ValueError('Cols c1=' + str(c1) + ' <= c0=' + str(c0))
 
-        c = self.num_cols
-        tmp_idx = []
-        tmp_marks = []
-        for i in range(self.num_rows):
-            tmp_idx += self.idx[i * c:i * c + c0] + self.idx[i * c + c1:(i + 1) * c]
-            tmp_marks += self.marks[i * c:i * c + c0] + self.marks[i * c + c1:(i + 1) * c]
-
-        self.idx = tmp_idx
-        self.marks = tmp_marks
+        self.idx = numpy.delete(self.get_idx_grid(), numpy.s_[c0:c1], axis=1).ravel()
+        self.marks = numpy.delete(self.get_marks_grid(), numpy.s_[c0:c1], axis=1).ravel()
         self.num_cols -= (c1 - c0)
         if (do_recalc_geometry):
             self.recalc_geometry()
@@ -346,11 +351,8 @@ class HTMLTable:
         if c0 < 0 or c0 >= self.num_cols - 1:
             raise ValueError('Cols c0=' + str(c0) + ' and c0 out of range')
 
-        for i in range(self.num_rows):
-            if (self.has_item_at(i, c0) and self.has_item_at(i, c0 + 1)):
-                return False
-
-        return True
+        grid = self.get_idx_grid()
+        return not numpy.any((grid[:, c0] >= 0) & (grid[:, c0 + 1] >= 0))
 
     def merge_rows(self, r0, reconnect=False):  # merge rows r0 and r0+1
         if (r0 < 0 or r0 >= self.num_rows - 1):
@@ -358,16 +360,19 @@ class HTMLTable:
 
         for j in range(self.num_cols):
             ix0 = self.get_ix(r0, j)
-            ix1 = self.get_ix(r0 + 1, j)
-            if self.idx[ix0] == -1:
-                self.idx[ix0] = self.idx[ix1]
-            elif self.idx[ix1] == -1:
+            idx0 = self.idx.item(ix0)
+            idx1 = self.get_idx(r0 + 1, j)
+            if idx0 == -1:
+                self.idx[ix0] = idx1
+            elif idx1 == -1:
                 # self.idx[ix0] = ix0
                 pass
             else:
+                self.log_item_change(idx0)
+                self.log_item_change(idx1)
                 if reconnect:
-                    self.items[self.idx[ix0]].reconnect(self.items[self.idx[ix1]], self.items)
-                self.items[self.idx[ix0]].merge(self.items[self.idx[ix1]])
+                    self.items[idx0].reconnect(self.items[idx1], self.items)
+                self.items[idx0].merge(self.items[idx1])
 
         self.delete_rows(r0 + 1, r0 + 2, False)
 
@@ -375,61 +380,68 @@ class HTMLTable:
         if (c0 < 0 or c0 >= self.num_cols - 1):
             raise ValueError('Cols c0=' + str(c0) + ' and c0 out of range')
 
-        for i in range(self.num_rows):
-            ix0 = self.get_ix(i, c0)
-            ix1 = self.get_ix(i, c0 + 1)
-            if self.idx[ix0] == -1:
-                self.idx[ix0] = self.idx[ix1]
+        grid = self.get_idx_grid()
+        grid[:, c0] = numpy.where(grid[:, c0] == -1, grid[:, c0 + 1], grid[:, c0])
 
         self.delete_cols(c0 + 1, c0 + 2, False)
 
-    def merge_down_all_rows(self):
+    def merge_down_all_rows(self):  # returns True iff any rows were merged
         # print_subset(0, self.items, self.idx)
-        for i in range(self.num_rows - 1):
+        # always merges the first mergable pair of rows, until no more rows can be merged. whether rows i and i+1 are
+        # mergable only depends on these two rows, so after merging rows i and i+1, we only need to recheck from i-1 on
+        res = False
+        i = 0
+        while i < self.num_rows - 1:
             if self.is_row_mergable(i):
                 self.merge_rows(i)
-                self.merge_down_all_rows()
-                return
+                res = True
+                i = max(i - 1, 0)
+            else:
+                i += 1
+        return res
 
-    def merge_down_all_cols(self):
-        for j in range(self.num_cols - 1):
+    def merge_down_all_cols(self):  # returns True iff any cols were merged
+        # same as merge_down_all_rows
+        res = False
+        j = 0
+        while j < self.num_cols - 1:
             if self.is_col_mergable(j):
                 self.merge_cols(j)
-                self.merge_down_all_cols()
-                return
+                res = True
+                j = max(j - 1, 0)
+            else:
+                j += 1
+        return res
+
+    def get_non_empty_rows_mask(self):
+        return numpy.any(self.get_idx_grid() >= 0, axis=1)
+
+    def get_non_empty_cols_mask(self):
+        return numpy.any(self.get_idx_grid() >= 0, axis=0)
 
     def is_empty_row(self, r):
-        for j in range(self.num_cols):
-            if self.has_item_at(r, j):
-                return False
-        return True
+        return not numpy.any(self.get_idx_grid()[r] >= 0)
 
     def is_empty_col(self, c):
-        for i in range(self.num_rows):
-            if self.has_item_at(i, c):  # and self.get_item(i,c).txt != ''):
-                # print('HAS ITEM AT '+str(i)+','+str(c)+', namely: '+str(self.get_item(i,c)))
-                return False
-        return True
+        return not numpy.any(self.get_idx_grid()[:, c] >= 0)
+
+    def compactify(self):  # remove all empty rows and cols. returns True iff anything was removed
 
-    def compactify(self):  # remove all empty rows and cols
-
-        has_changed = True
-        while (has_changed):
-            has_changed = False
-            # rows
-            for i in range(self.num_rows - 1, -1, -1):
-                if self.is_empty_row(i):
-                    print_verbose(7, "Delete empty row : " + str(i))
-                    has_changed = True
-                    self.delete_rows(i, i + 1, False)
-            # cols
-            for j in range(self.num_cols - 1, -1, -1):
-                if self.is_empty_col(j):
-                    print_verbose(7, "Delete empty column : " + str(j))
-                    has_changed = True
-                    self.delete_cols(j, j + 1, False)
+        # removing empty rows never makes a col empty (and vice versa), so we can remove everything at once
+        rows_mask = self.get_non_empty_rows_mask()
+        cols_mask = self.get_non_empty_cols_mask()
+        res = not (numpy.all(rows_mask) and numpy.all(cols_mask))
+
+        if res:
+            print_verbose(7, "Delete empty rows : " + str(numpy.flatnonzero(~rows_mask).tolist()) +
+                          ", empty columns : " + str(numpy.flatnonzero(~cols_mask).tolist()))
+            self.idx = self.get_idx_grid()[rows_mask][:, cols_mask].ravel()
+            self.marks = self.get_marks_grid()[rows_mask][:, cols_mask].ravel()
+            self.num_rows = int(numpy.count_nonzero(rows_mask))
+            self.num_cols = int(numpy.count_nonzero(cols_mask))
 
         self.recalc_geometry()
+        return res
 
     def throw_away_non_connected_rows(self):  # throw away rows that are probably not connected to the table
         def is_connected_row(r0):
@@ -465,13 +477,14 @@ class HTMLTable:
             if not is_connected_row(i):
                 print_verbose(5, "Throw away non-connected rows after /excl. :" + str(i))
                 print_verbose(5, "Current table: " + str(self))
-                self.delete_rows(i + 1, self.num_rows)
-                return
+                self.delete_rows(i + 1, self.num_rows, False)
+                return True
+        return False
 
     def throw_away_rows_after_new_header(self):
 
         if self.num_cols < 2 or self.num_rows < 3:
-            return
+            return False
 
         num_numeric_rows = 0
         num_rows_with_left_txt = 0
@@ -479,7 +492,7 @@ class HTMLTable:
         last_delta_y = 9999999
 
         for i in range(self.num_rows):
-            if self.has_item_at(i, 0) and FormatAnalyzer.looks_words(self.get_item(i, 0).txt):
+            if self.has_item_at(i, 0) and FormatAnalyzer.has_format(self.get_item(i, 0), FORMAT_WORDS):
                 num_rows_with_left_txt += 1
             cur_numeric_values = 0
             cur_header_values = 0
@@ -489,10 +502,11 @@ class HTMLTable:
                 if self.has_item_at(i, j):
                     if cur_pos_y == 9999999:
                         cur_pos_y = self.get_item(i, j).pos_y
-                    txt = self.get_item(i, j).txt
-                    if FormatAnalyzer.looks_numeric(txt) and not FormatAnalyzer.looks_year(txt):
+                    it = self.get_item(i, j)
+                    if FormatAnalyzer.has_format(it, FORMAT_NUMERIC) and not FormatAnalyzer.has_format(it, FORMAT_YEAR):
                         cur_numeric_values += 1
-                    elif ((FormatAnalyzer.looks_words(txt) and txt[0].isupper()) or FormatAnalyzer.looks_year(txt)):
+                    elif ((FormatAnalyzer.has_format(it, FORMAT_WORDS) and it.txt[0].isupper()) or
+                          FormatAnalyzer.has_format(it, FORMAT_YEAR)):
                         cur_header_values += 1
                     else:
                         cur_other_values += 1
@@ -506,28 +520,31 @@ class HTMLTable:
                 if cur_numeric_values == 0 and cur_header_values > 0 and cur_other_values == 0:
                     print_verbose(5, "Throw away non-connected rows after probably new headline at row = " + str(
                         i) + ", cur/last_delta_y=" + str(cur_delta_y) + "/" + str(last_delta_y))
-                    self.delete_rows(i, self.num_rows)
-                    return
+                    self.delete_rows(i, self.num_rows, False)
+                    return True
 
             last_pos_y = cur_pos_y
             last_delta_y = cur_delta_y
 
+        return False
+
     def throw_away_last_headline(self):
         # a headline at the end of a table probably doesnt belong to it, rather, it belongs to the next table
         if self.num_rows < 2 or self.num_cols < 2:
-            return
+            return False
 
         if not self.has_non_empty_item_at(self.num_rows - 1, 0):
-            return
+            return False
 
-        if FormatAnalyzer.looks_numeric(self.get_item(self.num_rows - 1, 0).txt):
-            return
+        if FormatAnalyzer.has_format(self.get_item(self.num_rows - 1, 0), FORMAT_NUMERIC):
+            return False
 
         for j in range(1, self.num_cols):
             if self.has_non_empty_item_at(self.num_rows - 1, j):
-                return
+                return False
 
-        self.delete_rows(self.num_rows - 1, self.num_rows)
+        self.delete_rows(self.num_rows - 1, self.num_rows, False)
+        return True
 
     def throw_away_non_connected_cols(self, page_width):  # throw away cols that are probably not connected to the table
         def is_connected_col(c0):
@@ -571,8 +588,9 @@ class HTMLTable:
             if not is_connected_col(j):
                 print_verbose(5, "Throw away non-connected cols after /excl. :" + str(j))
                 print_verbose(5, "Current table: " + str(self))
-                self.delete_cols(j + 1, self.num_cols)
-                return
+                self.delete_cols(j + 1, self.num_cols, False)
+                return True
+        return False
 
     def throw_away_cols_at_next_paragraph(self, paragraphs):
         def find_cur_paragraph_idx(x0, x1, my_paragraphs):
@@ -588,9 +606,7 @@ class HTMLTable:
             return res
 
         if self.num_cols == 0 or len(paragraphs) < 2:
-            return
-
-        self.recalc_geometry()
+            return False
 
         # Find relevant paragraphs
         my_paragraphs = []
@@ -632,10 +648,12 @@ class HTMLTable:
             if (j > 1 and cur_para_idx != last_para_idx):  # TODO 1 was 0, test is
                 # table is here probably split between two text paragraphs
                 print_verbose(5, "Throw away cols at next paragraph: col at next j=" + str(j))
-                self.delete_cols(j, self.num_cols)
-                return
+                self.delete_cols(j, self.num_cols, False)
+                return True
             last_para_idx = cur_para_idx
 
+        return False
+
     def throw_away_cols_after_year_list(self):  # throw away cols after a list of years is over
 
         class YearCols:
@@ -651,7 +669,7 @@ class HTMLTable:
                 return "(r=" + str(self.r) + ",c0=" + str(self.c0) + ",c1=" + str(self.c1) + ")"
 
         if (self.num_cols < 5):
-            return
+            return False
 
         year_cols = []
 
@@ -662,20 +680,20 @@ class HTMLTable:
             j = 0
             while j < self.num_cols - 1:
                 if (self.has_item_at(i, j) and self.has_item_at(i, j + 1) and
-                        FormatAnalyzer.looks_year(self.get_item(i, j).txt) and
-                        FormatAnalyzer.looks_year(self.get_item(i, j + 1).txt) and
-                        abs(FormatAnalyzer.to_year(self.get_item(i, j + 1).txt) - FormatAnalyzer.to_year(
-                            self.get_item(i, j).txt)) == 1):
-                    dir = FormatAnalyzer.to_year(self.get_item(i, j + 1).txt) - FormatAnalyzer.to_year(
-                        self.get_item(i, j).txt)
+                        FormatAnalyzer.has_format(self.get_item(i, j), FORMAT_YEAR) and
+                        FormatAnalyzer.has_format(self.get_item(i, j + 1), FORMAT_YEAR) and
+                        abs(FormatAnalyzer.get_year(self.get_item(i, j + 1)) - FormatAnalyzer.get_year(
+                            self.get_item(i, j))) == 1):
+                    dir = FormatAnalyzer.get_year(self.get_item(i, j + 1)) - FormatAnalyzer.get_year(
+                        self.get_item(i, j))
                     cur_year_cols = YearCols(i, j)
                     # find last year col
                     # print("Now at cell:"+str(i)+","+str(j))
                     for j1 in range(j + 1, self.num_cols):
-                        if (self.has_item_at(i, j1) and FormatAnalyzer.looks_year(
-                                self.get_item(i, j1).txt) and FormatAnalyzer.to_year(
-                                self.get_item(i, j1).txt) - FormatAnalyzer.to_year(
-                                self.get_item(i, j1 - 1).txt) == dir):
+                        if (self.has_item_at(i, j1) and FormatAnalyzer.has_format(
+                                self.get_item(i, j1), FORMAT_YEAR) and FormatAnalyzer.get_year(
+                                self.get_item(i, j1)) - FormatAnalyzer.get_year(
+                                self.get_item(i, j1 - 1)) == dir):
                             cur_year_cols.c1 = j1
                         else:
                             break
@@ -686,7 +704,7 @@ class HTMLTable:
         print_verbose(6, '----->> Found year lists at: ' + str(year_cols))
 
         if (len(year_cols) < 2):
-            return
+            return False
 
         # test if we can throw away
 
@@ -716,7 +734,9 @@ class HTMLTable:
                 can_throw_away = True
 
         if can_throw_away:
-            self.delete_cols(year_cols[max_overlap_yc].c1 + 1, self.num_cols)
+            self.delete_cols(year_cols[max_overlap_yc].c1 + 1, self.num_cols, False)
+
+        return can_throw_away
 
     def throw_away_duplicate_looking_cols(self):
         # throw away columns that are looking like duplicates, and indicating another table
@@ -726,27 +746,29 @@ class HTMLTable:
                                                             self.get_all_cols_as_text(c1)) > 3
 
         if self.num_cols < 3:
-            return
+            return False
 
         for i in range(2, self.num_cols):
             if are_cols_similar(0, i):
                 print_verbose(7, "------->> cols 0 and " + str(i) + " are similar. Throw away from " + str(i))
-                self.delete_cols(i, self.num_cols)
-                return
+                self.delete_cols(i, self.num_cols, False)
+                return True
+        return False
 
     def identify_headline(self):
         if self.num_rows == 0 or self.num_cols == 0:
-            return
+            return False
 
-        if not self.has_item_at(0, 0) or not FormatAnalyzer.looks_words(self.get_item(0, 0).txt):
-            return
+        if not self.has_item_at(0, 0) or not FormatAnalyzer.has_format(self.get_item(0, 0), FORMAT_WORDS):
+            return False
 
         for j in range(1, self.num_cols):
             if self.has_item_at(0, j):
-                return
+                return False
 
         self.headline_idx.append(self.get_idx(0, 0))
-        self.delete_rows(0, 1)
+        self.delete_rows(0, 1, False)
+        return True
 
     def identify_non_numeric_special_items(self):
         def col_looks_numeric(c0):
@@ -754,10 +776,10 @@ class HTMLTable:
             num_words = 0
             for i in range(self.num_rows):
                 if self.has_item_at(i, c0):
-                    txt = self.get_item(i, c0).txt
-                    if FormatAnalyzer.looks_numeric(txt):
+                    it = self.get_item(i, c0)
+                    if FormatAnalyzer.has_format(it, FORMAT_NUMERIC):
                         num_numbers += 1
-                    elif FormatAnalyzer.looks_words(txt):
+                    elif FormatAnalyzer.has_format(it, FORMAT_WORDS):
                         num_words += 1
             return num_numbers >= 3 and num_words < num_numbers * 0.4
 
@@ -770,6 +792,8 @@ class HTMLTable:
                     return False
             return True
 
+        num_special_items = len(self.special_idx)
+
         for j in range(self.num_cols):
             if col_looks_numeric(j):
                 print_verbose(5, 'Numeric col found : ' + str(j))
@@ -782,7 +806,7 @@ class HTMLTable:
                     if not self.has_item_at(i, j):
                         r1 = i + 1
                         break  # empty line
-                    if FormatAnalyzer.looks_numeric(self.get_item(i, j).txt):
+                    if FormatAnalyzer.has_format(self.get_item(i, j), FORMAT_NUMERIC):
                         r1 = i + 1
                         break  # number
                     if self.get_item(i, j).get_font_characteristics() != font_char:
@@ -791,32 +815,44 @@ class HTMLTable:
                 # remove now special items (but not before first occurence)
                 for i in range(r1, self.num_rows):
                     if self.has_item_at(i, j):
-                        txt = self.get_item(i, j).txt
-                        if FormatAnalyzer.looks_words(txt) or FormatAnalyzer.looks_other_special_item(txt):
+                        it = self.get_item(i, j)
+                        if FormatAnalyzer.has_format(it, FORMAT_WORDS) or FormatAnalyzer.looks_other_special_item(it.txt):
                             cur_idx = self.get_idx(i, j)
                             self.idx[self.get_ix(i, j)] = -1
                             self.special_idx.append(cur_idx)
 
                 # remove even special items from headline, but only if there are no other headline items
-                if (self.has_item_at(r0, j) and is_only_item_in_row(r0, j) and (FormatAnalyzer.looks_words(
-                        self.get_item(r0, j).txt) or FormatAnalyzer.looks_other_special_item(
+                if (self.has_item_at(r0, j) and is_only_item_in_row(r0, j) and (FormatAnalyzer.has_format(
+                        self.get_item(r0, j), FORMAT_WORDS) or FormatAnalyzer.looks_other_special_item(
                     self.get_item(r0, j).txt))):
                     cur_idx = self.get_idx(r0, j)
                     self.idx[self.get_ix(r0, j)] = -1
                     self.special_idx.append(cur_idx)
 
+        return len(self.special_idx) > num_special_items
+
+    @staticmethod
+    def reset_overlapping_solver_stats():
+        # counters are class-level, so they must be reset, before a new directory is parsed
+        for k in HTMLTable.overlapping_solver_stats:
+            HTMLTable.overlapping_solver_stats[k] = 0
+
     def identify_overlapping_special_items(self):
         # *  Identify all remaing items that must be set to be special items
         #    because otherwise they would overlap with other columns.
         # *  This is tricky, because we need to find a minimal set of such items,
         #    which leads to an NP-complete problem.
-        # *  To solve it (fast in most cases), we employ a Backtracking algorithm
+        # *  To solve it (fast in most cases), we employ a Backtracking algorithm (branch-and-bound)
+        # *  Each set of removed items is only searched once (memo), and the search is bounded by a number of
+        #    operations (global_max_identify_complex_items_operations), so that the result never depends on timing
 
-        rec_counter = 0
-        timeout = False
-        t_start = 0
+        num_operations = 0
+        num_memo_hits = 0
+        budget_exhausted = False
         looks_numeric = []
         tmp_boundaries = []
+        removed_ix = []  # ix'es currently removed from tmp_idx
+        already_searched = set()  # sets of removed ix'es, that have already been searched
 
         def calc_single_col_boundary(tmp_idx, col0):
             cur_bdry = (9999999, -1)
@@ -872,23 +908,29 @@ class HTMLTable:
 
         def find_allowed_set_rec(tmp_idx, num_sp_items, last_sp_ix, lowest_num_so_far):
             # returns set of ix'es, such that after removing them, the rest is allowed (e.g., no overlap)
-            nonlocal rec_counter
-            nonlocal t_start
-            nonlocal timeout
+            nonlocal num_operations
+            nonlocal num_memo_hits
+            nonlocal budget_exhausted
             nonlocal looks_numeric
             nonlocal tmp_boundaries
 
-            rec_counter += 1
+            num_operations += 1
 
-            if (rec_counter % 1000 == 0):
-                t_now = time.time()
-                if (t_now - t_start > config_for_rb.global_max_identify_complex_items_timeout):  # max 5 sec TODO
-                    timeout = True
+            if num_operations > config_for_rb.global_max_identify_complex_items_operations:
+                budget_exhausted = True
 
-            if num_sp_items >= lowest_num_so_far or timeout:
+            if num_sp_items >= lowest_num_so_far or budget_exhausted:
                 print_verbose(20, "No better solution exists")
                 return 9999999, []  # we cant find a better solution
 
+            # the same set of removed items can be reached in different orders. once it was searched (with a bound not
+            # lower than the current one), searching it again can never yield a better solution
+            cur_key = frozenset(removed_ix)
+            if cur_key in already_searched:
+                num_memo_hits += 1
+                return lowest_num_so_far, []
+            already_searched.add(cur_key)
+
             first_overlapping_col = find_first_overlapping_col(tmp_boundaries)
             if first_overlapping_col == -1:
                 print_verbose(9, "Found solution, num_sp_items=" + str(num_sp_items))
@@ -906,10 +948,12 @@ class HTMLTable:
 
                 old = tmp_idx[ix]
                 tmp_idx[ix] = -1
+                removed_ix.append(ix)
                 old_bdry = tmp_boundaries[col]
                 tmp_boundaries[col] = calc_single_col_boundary(tmp_idx, col)
                 cur_lowest_num, cur_sp_ix = find_allowed_set_rec(tmp_idx, num_sp_items + 1, ix, lowest_num_so_far)
                 tmp_idx[ix] = old
+                removed_ix.pop()
                 tmp_boundaries[col] = old_bdry
                 if cur_lowest_num < lowest_num_so_far:
                     lowest_num_so_far = cur_lowest_num
@@ -920,28 +964,32 @@ class HTMLTable:
             return lowest_num_so_far, best_sp_ix + [last_sp_ix]
 
         if (self.num_cols == 0):
-            return  # nothing to do
+            return False  # nothing to do
 
-        tmp_idx = self.idx.copy()
+        tmp_idx = self.idx.tolist()
 
         for cur_idx in tmp_idx:
-            looks_numeric.append(FormatAnalyzer.looks_numeric(self.items[cur_idx].txt))
+            looks_numeric.append(FormatAnalyzer.has_format(self.items[cur_idx], FORMAT_NUMERIC))
 
         tmp_boundaries = calc_col_boundaries(tmp_idx)
 
-        t_start = time.time()
         lowest_num_so_far, sp_ix = find_allowed_set_rec(tmp_idx, 0, -1, 9999999)
-        t_end = time.time()
-        print_verbose(3, "---> find_allowed_set_rec completed after time=" + str(
-            t_end - t_start) + "sec,  recursions=" + str(rec_counter))
+        print_verbose(3, "---> find_allowed_set_rec completed after operations=" + str(
+            num_operations) + ", memo_hits=" + str(num_memo_hits) + ", budget_exhausted=" + str(budget_exhausted))
 
-        if timeout and lowest_num_so_far == 9999999:
+        stats = HTMLTable.overlapping_solver_stats
+        stats['calls'] += 1
+        stats['operations'] += num_operations
+        stats['memo_hits'] += num_memo_hits
+        stats['budget_exhausted'] += 1 if budget_exhausted else 0
+
+        if budget_exhausted and lowest_num_so_far == 9999999:
             # we couldn't find a solution => give up on this table
             print_verbose(3, "---> No solution. Give up")
-            return
+            return False
 
         if lowest_num_so_far == 9999999:
-            return
+            return False
 
         # make sure, that we don't throw out too many items
         for ix in sp_ix:
@@ -955,21 +1003,21 @@ class HTMLTable:
         for ix in sp_ix:
             if (ix != -1):
                 # could this one stay?
-                tmp_idx[ix] = self.idx[ix]
+                tmp_idx[ix] = self.idx.item(ix)
                 tmp_bdry = calc_col_boundaries(tmp_idx)
                 if find_first_overlapping_col(tmp_bdry) != -1:
                     # no, it can't
                     sp_ix_final.append(ix)
                 tmp_idx[ix] = -1
 
+        has_changed = False
         for ix in sp_ix_final:
             if (ix != -1):
-                self.special_idx.append(self.idx[ix])
+                self.special_idx.append(self.idx.item(ix))
                 self.idx[ix] = -1
+                has_changed = True
 
-        self.recalc_geometry()
-
-        return
+        return has_changed
 
     def throw_away_distant_special_items(self, page_width):
         tmp = []
@@ -982,6 +1030,41 @@ class HTMLTable:
                               str(self.table_rect) + " and distance: " + str(dist))
         self.special_idx = sorted(tmp, key=lambda i: self.items[i].pos_y)
 
+    def log_item_change(self, i):
+        """
+        Remembers the state of item i before it is changed for the first time, so that cleanup_table can restore it
+        later. Does nothing if cleanup_table is not running.
+
+        Args:
+            i (int): Index of the item that is about to be changed (by HTMLItem.merge).
+        """
+        if self.undo_log is None or i in self.undo_log:
+            return
+        it = self.items[i]
+        self.undo_log[i] = (it.txt, it.initial_height, it.height, it.width, it.words)
+        # merged_lists are changed in place, and might be shared with other items (see HTMLItem.split)
+        if id(it.merged_list) not in self.undo_merged_lists:
+            self.undo_merged_lists[id(it.merged_list)] = (it.merged_list, it.merged_list.copy())
+
+    def restore_item(self, i, restored_lists):
+        """
+        Restores item i to the state it had when cleanup_table was started.
+
+        Args:
+            i (int): Index of the item.
+            restored_lists (dict): Already restored merged_lists. Items that shared a merged_list before, will share
+                the restored one again.
+        """
+        it = self.items[i]
+        if i in self.undo_log:
+            it.txt, it.initial_height, it.height, it.width, words = self.undo_log[i]
+            it.words = words.copy()
+        key = id(it.merged_list)
+        if key not in restored_lists:
+            old_list = self.undo_merged_lists[key][1] if key in self.undo_merged_lists else it.merged_list
+            restored_lists[key] = old_list.copy()
+        it.merged_list = restored_lists[key]
+
     def cleanup_table(self, page_width, paragraphs):
         """
         HTMLTable is cleaned
@@ -990,79 +1073,59 @@ class HTMLTable:
             page_width (int): Width of HTMLPage.
             paragraphs (list): List of HTML Paragraphs.
         """
-        bak_items = deepcopy(self.items)
-        bak_idx = deepcopy(self.idx)
-
-        num_cells = -1
-        old_num_actual_items = -1
-        old_num_rows = -1
-        old_num_cols = -1
+        # instead of copying all items, we only remember the items that are actually changed
+        self.undo_log = {}
+        self.undo_merged_lists = {}
+        bak_idx = self.idx.tolist()
+
+        # All passes return True iff they have changed the table, and they only depend on the table. Hence, a pass
+        # that did not change anything, must only be run again after any other pass has changed the table.
+        # The geometry is recalculated (by compactify) only after the table has been changed.
+        passes = [
+            ('throw_away_non_connected_rows', self.throw_away_non_connected_rows),
+            ('throw_away_rows_after_new_header', self.throw_away_rows_after_new_header),
+            ('throw_away_non_connected_cols', lambda: self.throw_away_non_connected_cols(page_width)),
+            ('throw_away_cols_at_next_paragraph', lambda: self.throw_away_cols_at_next_paragraph(paragraphs)),
+            ('throw_away_cols_after_year_list', self.throw_away_cols_after_year_list),
+            ('throw_away_duplicate_looking_cols', self.throw_away_duplicate_looking_cols),
+            ('merge_down_all_rows', self.merge_down_all_rows),
+            ('merge_down_all_cols', self.merge_down_all_cols),
+            ('identify_headline', self.identify_headline),
+            ('throw_away_last_headline', self.throw_away_last_headline),
+            ('identify_overlapping_special_items', self.identify_overlapping_special_items),
+            ('identify_non_numeric_special_items', self.identify_non_numeric_special_items)]
+
+        version = 0  # will be increased with every change
+        unchanged_at_version = {}  # for each pass: version, at which it was run without any change
+        compactified_at_version = -1
 
         print_verbose(3, 'Table before cleanup: ' + str(self))
 
         while True:
-            cur_num_actual_items = self.count_actual_items()
-            if cur_num_actual_items == old_num_actual_items and self.num_rows == old_num_rows and self.num_cols == old_num_cols:
-                break  # no more changes
-
-            old_num_actual_items = cur_num_actual_items
-            old_num_rows = self.num_rows
-            old_num_cols = self.num_cols
-
             print_verbose(3, "--> Next cleanuptable iteration")
-            self.compactify()
-            print_verbose(6, "------>> After compactify:" + str(self.get_printed_repr()))
-            self.recalc_geometry()
-            print_verbose(6, "------>> After recalc_geometry:" + str(self.get_printed_repr()))
-            self.compactify()
-            self.throw_away_non_connected_rows()
-            print_verbose(6, "------>> After throw_away_non_connected_rows:" + str(self.get_printed_repr()))
-            self.compactify()
-            self.throw_away_rows_after_new_header()
-            print_verbose(6, "------>> After throw_away_rows_after_new_header:" + str(self.get_printed_repr()))
+            old_version = version
 
-            self.compactify()
-            self.throw_away_non_connected_cols(page_width)
-            print_verbose(6, "------>> After throw_away_non_connected_cols:" + str(self.get_printed_repr()))
-            self.compactify()
-            self.throw_away_cols_at_next_paragraph(paragraphs)
-            print_verbose(6, "------>> After throw_away_cols_at_next_paragraph:" + str(self.get_printed_repr()))
-            self.compactify()
-            self.throw_away_cols_after_year_list()
-            print_verbose(6, "------>> After throw_away_cols_after_year_list:" + str(self.get_printed_repr()))
-            self.compactify()
-            self.throw_away_duplicate_looking_cols()
-            print_verbose(6, "------>> After throw_away_duplicate_looking_cols:" + str(self.get_printed_repr()))
-            self.compactify()
-            self.merge_down_all_rows()
-            print_verbose(6, "------>> After merge_down_all_rows:" + str(self.get_printed_repr()))
+            for pass_name, cur_pass in passes:
+                if compactified_at_version != version:
+                    if self.compactify():
+                        version += 1
+                    compactified_at_version = version
+                    print_verbose(6, "------>> After compactify:" + str(self.get_printed_repr()))
 
-            self.compactify()
-            self.merge_down_all_cols()
-            print_verbose(6, "------>> After merge_down_all_cols:" + str(self.get_printed_repr()))
-
-            self.compactify()
-            self.identify_headline()
-            print_verbose(6, "------>> After identify_headline:" + str(self.get_printed_repr()))
-
-            self.compactify()
-            self.throw_away_last_headline()
-            print_verbose(6, "------>> After throw_away_last_headline:" + str(self.get_printed_repr()))
+                if unchanged_at_version.get(pass_name) == version:
+                    continue  # table has not changed since last run => nothing would change
 
-            self.compactify()
-            self.identify_overlapping_special_items()
-            print_verbose(6, "------>> After identify_overlapping_special_items:" + str(self.get_printed_repr()))
-            # raise ValueError('XXX')
+                if cur_pass():
+                    version += 1
+                else:
+                    unchanged_at_version[pass_name] = version
+                print_verbose(6, "------>> After " + pass_name + ":" + str(self.get_printed_repr()))
 
-            self.compactify()
-            self.identify_non_numeric_special_items()
-            print_verbose(6, "------>> After identify_non_numeric_special_items:" + str(self.get_printed_repr()))
+            if version == old_version:
+                break  # no more changes
 
+        if compactified_at_version != version:
             self.compactify()
-            self.recalc_geometry()
-            print_verbose(6, "------>> After recalc_geometry:" + str(self.get_printed_repr()))
-
-        self.compactify()
 
         self.special_idx = sorted(self.special_idx, key=lambda i: self.items[i].pos_y)
         self.throw_away_distant_special_items(page_width)
@@ -1070,20 +1133,24 @@ class HTMLTable:
         print_verbose(6, "------>> After throw_away_distant_special_items:" + str(self.get_printed_repr()))
 
         # restore all items that are no longer part of that table
-        to_restore = list(set(bak_idx) - set(self.idx + [-1]))
+        to_restore = list(set(bak_idx) - set(self.idx.tolist() + [-1]))
         print_verbose(3, "Restoring old items with idx: " + str(to_restore))
+        restored_lists = {}
+        cur_idx = set(self.idx.tolist())
         for i in to_restore:
             # was this item merged and the merged item is still used?
             was_merged = False
             for k in self.items[i].merged_list:
-                if k in self.idx:
+                if k in cur_idx:
                     was_merged = True
                     break
             if (not was_merged):
                 print_verbose(6, '----> Old item ' + str(i) + ' was not merged => Restore')
-                self.items[i] = bak_items[i]
+                self.restore_item(i, restored_lists)
             else:
                 print_verbose(6, '----> Old item ' + str(i) + ' was merged => Dont touch')
+        self.undo_log = None
+        self.undo_merged_lists = None
 
         self.compactify()
 
@@ -1115,13 +1182,13 @@ class HTMLTable:
 
         cnt_numerics = 0
         cnt_weak_numerics = 0
-        for i in self.idx:
+        for i in self.idx.tolist():
             if i != -1:
-                txt = self.items[i].txt
-                if FormatAnalyzer.looks_numeric(txt) and not FormatAnalyzer.looks_year(txt):
+                it = self.items[i]
+                if FormatAnalyzer.has_format(it, FORMAT_NUMERIC) and not FormatAnalyzer.has_format(it, FORMAT_YEAR):
                     cnt_numerics += 1
                     cnt_weak_numerics += 1
-                elif FormatAnalyzer.looks_weak_numeric(txt):
+                elif FormatAnalyzer.has_format(it, FORMAT_WEAK_NUMERIC):
                     cnt_weak_numerics += 1
 
         print_verbose(7, "----->> reached end of is_good_table")
@@ -1134,7 +1201,7 @@ class HTMLTable:
         Assigns a set of HTMLItems a table related category.
         """
         print_verbose(7, "--> Categorize as new table: " + str(self))
-        for i in self.idx:
+        for i in self.idx.tolist():
             if i != -1:
                 self.items[i].category = CAT_TABLE_DATA
         for i in self.headline_idx:
@@ -1163,51 +1230,49 @@ class HTMLTable:
         """
 
         self.items = p_items
-        self.idx = p_idx.copy()
-        self.idx = sorted(self.idx, key=lambda i: self.items[i].pos_y)
+        sorted_idx = sorted(p_idx, key=lambda i: self.items[i].pos_y)
+        self.idx = numpy.array(sorted_idx, dtype=int)
+        self.marks = numpy.zeros(len(sorted_idx), dtype=int)
 
         self.num_cols = 1
-        self.num_rows = len(self.idx)
+        self.num_rows = len(sorted_idx)
 
         sum_align_pos_x = 0
 
-        for i in self.idx:
+        for i in sorted_idx:
             # self.rows.append(self.items[i].get_rect())
-            self.marks.append(0)
             sum_align_pos_x += self.items[i].get_aligned_pos_x()
 
-        self.col_aligned_pos_x.append(sum_align_pos_x / len(self.idx))
+        self.col_aligned_pos_x.append(sum_align_pos_x / len(sorted_idx))
         self.recalc_geometry()
 
     def find_top_marked_idx(self, mark):
         res = -1
         pos_y = 9999999
-        for i in range(len(self.idx)):
-            if (self.has_item_at_ix(i)):
-                cur_y = self.get_item_by_ix(i).pos_y
-                if (cur_y < pos_y and self.marks[i] == mark):
-                    pos_y = cur_y
-                    res = i
+        for i in numpy.flatnonzero((self.idx >= 0) & (self.marks == mark)).tolist():
+            cur_y = self.get_item_by_ix(i).pos_y
+            if (cur_y < pos_y):
+                pos_y = cur_y
+                res = i
         return res
 
     def find_marked_idx_at_y0(self, mark, id, y0, new_mark):
         res = []
-        for i in range(len(self.idx)):
-            if self.has_item_at_ix(i) and self.marks[i] == mark:
-                if self.get_item_by_ix(i).pos_y == y0:
-                    res.append((id, i))
-                    self.marks[i] = new_mark
+        for i in numpy.flatnonzero((self.idx >= 0) & (self.marks == mark)).tolist():
+            if self.get_item_by_ix(i).pos_y == y0:
+                res.append((id, i))
+                self.marks[i] = new_mark
         return res
 
     def find_marked_idx_between_y0_y1_at_col(self, mark, id, y0, y1, col, new_mark):
         res = []
-        for i in range(self.num_rows):
+        candidates = (self.get_idx_grid()[:, col] >= 0) & (self.get_marks_grid()[:, col] == mark)
+        for i in numpy.flatnonzero(candidates).tolist():
             ix = self.get_ix(i, col)
-            if self.has_item_at_ix(ix) and self.marks[ix] == mark:
-                r = self.get_item_by_ix(ix).get_rect()
-                if r.y0 < y1 and r.y1 >= y0:
-                    res.append((id, ix))
-                    self.marks[ix] = new_mark
+            r = self.get_item_by_ix(ix).get_rect()
+            if r.y0 < y1 and r.y1 >= y0:
+                res.append((id, ix))
+                self.marks[ix] = new_mark
         return res
 
     @staticmethod
@@ -1338,7 +1403,7 @@ class HTMLTable:
                         tmp_items.append(-1)
                     else:
                         id, ix = list_idx[0]
-                        tmp_items.append(tab1.idx[ix] if id == 1 else tab2.idx[ix])
+                        tmp_items.append(tab1.idx.item(ix) if id == 1 else tab2.idx.item(ix))
 
                 tmp_cols.append(tmp_items)
 
@@ -1353,7 +1418,7 @@ class HTMLTable:
         if (tab1.items != tab2.items):
             raise ValueError('tab1 and tab2 belong to different HTMLPages')
 
-        tmp_idx = tab1.idx + tab2.idx
+        tmp_idx = tab1.idx.tolist() + tab2.idx.tolist()
         tmp_idx = list(filter(lambda ix: ix != -1, tmp_idx))
         if (len(tmp_idx) != len(set(tmp_idx))):
             raise ValueError('tab1 ' + str(tab1.idx) + ' and tab2 ' + str(tab2.idx) + ' intersect')
@@ -1410,12 +1475,9 @@ class HTMLTable:
         res.items = tab1.items
         res.num_rows = len(tmp_rows)
         res.num_cols = len(tmp_cols)
-        res.idx = [-1] * (res.num_rows * res.num_cols)
-        res.marks = [0] * (res.num_rows * res.num_cols)
-
-        for j in range(res.num_cols):
-            for i in range(res.num_rows):
-                res.idx[i * res.num_cols + j] = tmp_cols[j][i]
+        # tmp_cols is column-major
+        res.idx = numpy.array(tmp_cols, dtype=int).reshape(res.num_cols, res.num_rows).T.ravel()
+        res.marks = numpy.zeros(res.num_rows * res.num_cols, dtype=int)
 
         res.recalc_geometry()
 
@@ -1473,9 +1535,9 @@ class HTMLTable:
         n0 = False
         n1 = False
         for j in range(self.num_cols):
-            if (self.has_item_at(r0, j) and FormatAnalyzer.looks_numeric(self.get_item(r0, j).txt)):
+            if (self.has_item_at(r0, j) and FormatAnalyzer.has_format(self.get_item(r0, j), FORMAT_NUMERIC)):
                 n0 = True
-            if (self.has_item_at(r0 + 1, j) and FormatAnalyzer.looks_numeric(self.get_item(r0 + 1, j).txt)):
+            if (self.has_item_at(r0 + 1, j) and FormatAnalyzer.has_format(self.get_item(r0 + 1, j), FORMAT_NUMERIC)):
                 n1 = True
 
         if (n0 and n1):
@@ -1586,20 +1648,20 @@ class HTMLTable:
             j = 0
             while j < self.num_cols - 1:
                 if (self.has_item_at(i, j) and self.has_item_at(i, j + 1) and
-                        FormatAnalyzer.looks_year(self.get_item(i, j).txt) and
-                        FormatAnalyzer.looks_year(self.get_item(i, j + 1).txt) and
-                        abs(FormatAnalyzer.to_year(self.get_item(i, j + 1).txt) - FormatAnalyzer.to_year(
-                            self.get_item(i, j).txt)) == 1):
-                    dir = FormatAnalyzer.to_year(self.get_item(i, j + 1).txt) - FormatAnalyzer.to_year(
-                        self.get_item(i, j).txt)
+                        FormatAnalyzer.has_format(self.get_item(i, j), FORMAT_YEAR) and
+                        FormatAnalyzer.has_format(self.get_item(i, j + 1), FORMAT_YEAR) and
+                        abs(FormatAnalyzer.get_year(self.get_item(i, j + 1)) - FormatAnalyzer.get_year(
+                            self.get_item(i, j))) == 1):
+                    dir = FormatAnalyzer.get_year(self.get_item(i, j + 1)) - FormatAnalyzer.get_year(
+                        self.get_item(i, j))
                     cur_year_cols = YearCols(i, j)
                     # find last year col
                     # print("Now at cell:"+str(i)+","+str(j))
                     for j1 in range(j + 1, self.num_cols):
                         if (self.has_item_at(i, j1) and
-                                FormatAnalyzer.looks_year(self.get_item(i, j1).txt) and
-                                FormatAnalyzer.to_year(self.get_item(i, j1).txt) - FormatAnalyzer.to_year(
-                                    self.get_item(i, j1 - 1).txt) == dir):
+                                FormatAnalyzer.has_format(self.get_item(i, j1), FORMAT_YEAR) and
+                                FormatAnalyzer.get_year(self.get_item(i, j1)) - FormatAnalyzer.get_year(
+                                    self.get_item(i, j1 - 1)) == dir):
                             cur_year_cols.c1 = j1
                         else:
                             break
@@ -1618,20 +1680,42 @@ class HTMLTable:
         res = []
         for y in yl:
             if y[0] - 1 > 0:
-                cur_tab = deepcopy(self)
-                if y[1] + 1 < cur_tab.num_cols:
-                    cur_tab.delete_cols(y[1] + 1, cur_tab.num_cols)
-                cur_tab.delete_cols(0, y[0] - 1)
+                cur_tab = self.generate_col_range_table(y[0] - 1, min(y[1] + 1, self.num_cols))
                 print_verbose(6, "Found sub-table:\n" + str(cur_tab.get_printed_repr()))
                 res.append(cur_tab)
 
         return res
 
+    def generate_col_range_table(self, c0, c1):
+        """
+        Generates a sub-table that consists of the cols c, where c0 <= c < c1. The sub-table shares the items with
+        this table (no copies), and only has its own cells and geometry.
+
+        Args:
+            c0 (int): First col.
+            c1 (int): Col after the last col.
+
+        Returns:
+            HTMLTable: The sub-table.
+        """
+        res = HTMLTable()
+        res.items = self.items
+        res.num_rows = self.num_rows
+        res.num_cols = c1 - c0
+        res.idx = self.get_idx_grid()[:, c0:c1].flatten()
+        res.marks = self.get_marks_grid()[:, c0:c1].flatten()
+        res.headline_idx = self.headline_idx.copy()
+        res.special_idx = self.special_idx.copy()
+        res.parent_table = self
+        res.parent_col0 = c0
+        res.recalc_geometry()
+        return res
+
     def save_to_csv(self, csv_file):
         ctab = ConsoleTable(self.num_cols)
 
         for ix in range(self.num_rows * self.num_cols):
-            ctab.cells.append(self.items[self.idx[ix]].txt if self.has_item_at_ix(ix) else '')
+            ctab.cells.append(self.get_item_by_ix(ix).txt if self.has_item_at_ix(ix) else '')
 
         res = ctab.to_string(use_format=ConsoleTable.FORMAT_CSV)
 
@@ -1689,6 +1773,25 @@ class HTMLTable:
 
         return res
 
+    def cleanup_for_export(self):
+        """
+        Cleanup internal attributes not needed for export, and store cells as plain lists.
+        """
+        self.items = None
+        self.idx = self.idx.tolist()
+        self.marks = self.marks.tolist()
+
+    def regenerate_not_exported(self, items):
+        """
+        Regenerate the items list and the cell arrays after export / import.
+
+        Args:
+            items (list): List of items.
+        """
+        self.items = items
+        self.idx = numpy.array(self.idx, dtype=int)
+        self.marks = numpy.array(self.marks, dtype=int)
+
     def __repr__(self):
         res = 'Row-Dim: ' + str(self.rows)
         res += '\nCol-Dim: ' + str(self.cols)
@@ -17,8 +17,11 @@ class HTMLWord:
         txt (str): The text content of the word.
         rect (Rect): The rectangle coordinates of the word, an instance of the Rect class.
         item_id (int): The ID of the HTMLItem to which this word belongs.
+        format_info (tuple): Cached classification of txt (see FormatAnalyzer.get_format_info). None if not yet computed
     """
 
+    __slots__ = ('txt', 'rect', 'item_id', 'format_info')
+
     def __init__(self):
         """
         Initializes an instance of the HTMLWord class.
@@ -26,3 +29,4 @@ class HTMLWord:
         self.txt = ''
         self.rect = Rect(99999, 99999, -1, -1)
         self.item_id = -1
+        self.format_info = None
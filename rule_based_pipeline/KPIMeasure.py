@@ -9,22 +9,9 @@ from globals import remove_trailing_slash
 
 
 class KPIMeasure:
-    kpi_id = None
-    kpi_name = None
-    src_file = None
-    src_path = None
-    company_name = None
-    page_num = None
-    item_ids = None
-    pos_x = None
-    pos_y = None
-    raw_txt = None
-    year = None
-    value = None
-    score = None
-    unit = None
-    match_type = None
-    tmp = None  # for temporary values used by an Analyzer
+    __slots__ = ('kpi_id', 'kpi_name', 'src_file', 'src_path', 'company_name', 'page_num', 'item_ids', 'pos_x',
+                 'pos_y', 'raw_txt', 'year', 'value', 'score', 'unit', 'match_type',
+                 'tmp')  # tmp: for temporary values used by an Analyzer
 
     def __init__(self):
         self.kpi_id = -1
@@ -4,10 +4,17 @@
 # Author : Ismail Demir (G124272)
 # Date   : 23.06.2020
 # ============================================================================================================================
+import numpy
 import re
+import config_for_rb
 from FormatAnalyzer import FormatAnalyzer
-from globals import print_verbose
-from Rect import Rect
+from globals import print_verbose, FORMAT_NUMERIC, FORMAT_PERCENTAGE, FORMAT_YEAR
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
 
 # Matching modes:
 MATCHING_MUST_INCLUDE = 0  # no match, if not included
@@ -27,6 +34,113 @@ VALUE_PERCENTAGE_MUST = 1
 VALUE_PERCENTAGE_MUST_NOT = 2
 
 
+def find_required_literals(pattern_raw):
+    """
+    Finds literals that must be included in each text matched by a regular expression.
+    Literals are split at whitespaces, so each of them must be included in a single word (or item).
+
+    Args:
+        pattern_raw (str): Raw regular expression pattern.
+
+    Returns:
+        list: List of requirements. Each requirement is a list of alternative literals, at least one of them must
+              be included in each matched text.
+    """
+    def find_rec(sub_pattern):
+        res = []
+        run = ''  # consecutive literal chars
+
+        def flush(run):
+            for lit in run.split():
+                res.append([lit])
+
+        for op, av in sub_pattern:
+            if op == sre_constants.LITERAL:
+                run += chr(av)
+                continue
+            flush(run)
+            run = ''
+            if op == sre_constants.SUBPATTERN:
+                if av[1] == 0 and av[2] == 0:  # no flags changed
+                    res.extend(find_rec(av[3]))
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+                if av[0] >= 1:
+                    res.extend(find_rec(av[2]))
+            elif op == sre_constants.BRANCH:
+                alternatives = []
+                for branch in av[1]:
+                    cur = find_rec(branch)
+                    if len(cur) == 0:
+                        alternatives = None
+                        break  # this branch doesn't require anything
+                    alternatives.extend(max(cur, key=lambda req: min(len(lit) for lit in req)))
+                if alternatives is not None:
+                    res.append(alternatives)
+        flush(run)
+        return res
+
+    parsed = sre_parse.parse(pattern_raw)
+    if parsed.state.flags & re.IGNORECASE:
+        return []  # we can't tell
+    return find_rec(parsed)
+
+
+class CompiledDescPattern:
+    """
+    Compiled regular expression of a DescRegExMatch. It is shared by all DescRegExMatches (of all KPIs) with the
+    same pattern, so each pattern is evaluated only once per text node.
+    Before the regex is run, the required literals are checked, which is much faster for nodes that can't match.
+
+    Attributes:
+        pattern_regex: The compiled regular expression.
+        case_sensitive (bool): If False, the regex is matched against the lower-case text.
+        required_literals (list): See find_required_literals.
+        results (dict): txt -> True/False, if txt is matched.
+    """
+    MAX_NUM_RESULTS = 100000  # results are dropped, if there are more (e.g., after many documents)
+
+    all_patterns = {}  # (pattern_raw, case_sensitive) -> CompiledDescPattern
+
+    def __init__(self, pattern_raw, case_sensitive):
+        # Note: using lower-case here would destroy regexp patterns like \S
+        self.pattern_regex = re.compile(pattern_raw)
+        self.case_sensitive = case_sensitive
+        self.required_literals = find_required_literals(pattern_raw)
+        self.results = {}
+
+    @staticmethod
+    def get(pattern_raw, case_sensitive):
+        key = (pattern_raw, case_sensitive)
+        if key not in CompiledDescPattern.all_patterns:
+            CompiledDescPattern.all_patterns[key] = CompiledDescPattern(pattern_raw, case_sensitive)
+        return CompiledDescPattern.all_patterns[key]
+
+    def match(self, txt):
+        """
+        Same as bool(pattern_regex.match(txt)) (resp. txt.lower()), but cached and prefiltered.
+
+        Args:
+            txt (str): Text of the node.
+
+        Returns:
+            bool: True if the node matches, False otherwise.
+        """
+        res = self.results.get(txt)
+        if res is None:
+            t = txt if self.case_sensitive else txt.lower()
+            res = True
+            for req in self.required_literals:
+                if not any(lit in t for lit in req):
+                    res = False
+                    break
+            if res:
+                res = bool(self.pattern_regex.match(t))
+            if len(self.results) >= CompiledDescPattern.MAX_NUM_RESULTS:
+                self.results = {}
+            self.results[txt] = res
+        return res
+
+
 class KPISpecs:
     # This class contains specifications for one KPI that should be extracted
 
@@ -52,6 +166,10 @@ class KPISpecs:
         count_if_matched = None
         # if this is TRUE, then we will try to match against a concatenation of all nodes. Default: FALSE
         allow_matching_against_concat_txt = None
+        # literals that must be included in each matched text (see find_required_literals)
+        required_literals = None
+        # shared CompiledDescPattern
+        compiled_pattern = None
 
         def __init__(self, pattern_raw, score, matching_mode, score_decay, case_sensitive, multi_match_decay,
                      letter_decay_hl, letter_decay_disregard=0, count_if_matched=True,
@@ -77,14 +195,31 @@ class KPISpecs:
             self.matching_mode = matching_mode
             self.score_decay = score_decay
             self.case_sensitive = case_sensitive
-            # if case_sensitive else pattern_raw.lower())
-            # Note: using lower-case here would destroy regexp patterns like \S
-            self.pattern_regex = re.compile(pattern_raw)
+            self.compiled_pattern = CompiledDescPattern.get(pattern_raw, case_sensitive)
+            self.pattern_regex = self.compiled_pattern.pattern_regex
             self.multi_match_decay = multi_match_decay
             self.letter_decay = 0.5 ** (1.0 / letter_decay_hl) if letter_decay_hl > 0 else 1
             self.letter_decay_disregard = letter_decay_disregard
             self.count_if_matched = count_if_matched
             self.allow_matching_against_concat_txt = allow_matching_against_concat_txt
+            self.required_literals = self.compiled_pattern.required_literals
+
+        def may_match_txt(self, txt, txt_lower):
+            """
+            Quick check, if any node of a text can be matched at all.
+
+            Args:
+                txt (str): Text of all nodes, separated by whitespaces.
+                txt_lower (str): Same, but lower-case.
+
+            Returns:
+                bool: False, if no node of txt can ever be matched, True otherwise.
+            """
+            t = txt if self.case_sensitive else txt_lower
+            for req in self.required_literals:
+                if not any(lit in t for lit in req):
+                    return False
+            return True
 
         def match_single_node(self, txt):
             """
@@ -96,7 +231,7 @@ class KPISpecs:
             Returns:
                 bool: True if the node matches, False otherwise.
             """
-            return bool(self.pattern_regex.match(txt if self.case_sensitive else txt.lower()))
+            return self.compiled_pattern.match(txt)
 
         def match_nodes(self, txt_nodes):
             """
@@ -176,6 +311,8 @@ class KPISpecs:
         multi_match_decay = None  # If a pattern is hit multiple times, the score will decay after each hit. 1=No decay, 0=Full decay after first hit
         letter_decay = None  # Generally, we prefer shorter texts to longer ones, because they contain less distractive garbage. So for each letter, the score decays. 1=No decay, 0 =Immediate, full decay
         letter_decay_disregard = None  # this number of letters will not be affected by decay at all
+        cached_page = None  # page for which cached_matches was computed
+        cached_matches = None  # precomputed (idx_list, txt_list, ref_x, ref_y, letter_factor) of all matching chains on cached_page
 
         def __init__(self, general_match, distance_mode, score, matching_mode, score_decay, multi_match_decay,
                      letter_decay_hl, letter_decay_disregard=0):
@@ -244,64 +381,122 @@ class KPISpecs:
 
             return None  # not implemented
 
-        def match(self, html_page, cur_item_idx):
+        def calc_distances(self, a, ref_x, ref_y, threshold):
             """
-            Match the pattern anywhere on the page near the current item.
+            Vectorized version of calc_distance for many reference points at once.
+
+            Args:
+                a (tuple): Coordinates of point A.
+                ref_x (numpy.ndarray): X coordinates of the reference points.
+                ref_y (numpy.ndarray): Y coordinates of the reference points.
+                threshold (float): Threshold value.
+
+            Returns:
+                numpy.ndarray: Calculated distances (-1 for excluded reference points).
+            """
+            if self.distance_mode == DISTANCE_EUCLIDIAN:
+                return numpy.sqrt((ref_x - a[0]) ** 2 + (ref_y - a[1]) ** 2)
+            if self.distance_mode not in (DISTANCE_MOD_EUCLID, DISTANCE_MOD_EUCLID_UP_ONLY):
+                return None  # not implemented
+
+            is_right = a[0] < ref_x - threshold  # reference_point text right of base point
+            if self.distance_mode == DISTANCE_MOD_EUCLID:
+                is_below = a[1] < ref_y - threshold  # reference_point text below base point
+                penalty = numpy.where(is_below, numpy.where(is_right, 90.0, 50.0), numpy.where(is_right, 50.0, 1.0))
+            else:
+                penalty = numpy.where(is_right, 50.0, 1.0)
+            dx = numpy.abs(ref_x - a[0])
+            dy = numpy.abs(ref_y - a[1])
+            dx_larger = dx > dy
+            dx = numpy.where(dx_larger, dx * 0.01, dx)
+            dy = numpy.where(dx_larger, dy, dy * 0.01)
+            res = penalty * numpy.sqrt(dx * dx + dy * dy)
+            if self.distance_mode == DISTANCE_MOD_EUCLID_UP_ONLY:
+                res = numpy.where(a[1] < ref_y, -1.0, res)  # reference_point text below base point
+            return res
+
+        def get_page_matches(self, html_page):
+            """
+            Get all split chains on the page that match the pattern. These do not depend on the current item,
+            so they are only computed once per page.
 
             Args:
                 html_page: An instance of the HTML page.
-                cur_item_idx (int): The index of the current item.
 
             Returns:
-                tuple: A tuple (bool, float) indicating whether there is a match and the final score.
+                tuple: (idx_list, txt_list, ref_x, ref_y, letter_factor) of all matching chains.
             """
-            taken = [False] * len(html_page.items)
-            matches = []  # list of (idx, txt, score_base)
-            base_rect = html_page.items[cur_item_idx].get_rect()
-            base_point = ((base_rect.x0 + base_rect.x1) * 0.5, (base_rect.y0 + base_rect.y1) * 0.5)
-            page_diag = (html_page.page_width ** 2 + html_page.page_height ** 2) ** 0.5
-            page_threshold = page_diag * 0.0007
+            if self.cached_page is html_page:
+                return self.cached_matches
 
+            taken = [False] * len(html_page.items)
+            idx_list = []
+            txt_list = []
+            ref_x = []
+            ref_y = []
+            letter_factor = []
             for i in range(len(html_page.items)):
                 if taken[i]:
                     continue
-                idx_list = html_page.explode_item_by_idx(i)
+                chain = html_page.get_split_chain(i)
                 # mark as taken
-                for j in idx_list:
+                for j in chain.idx_list:
                     taken[j] = True
-                txt = html_page.explode_item(i)
+                txt = chain.txt
                 if self.general_match.match(txt):
-                    rect = Rect(9999999, 9999999, -1, -1)
-                    for j in idx_list:
-                        rect.grow(html_page.items[j].get_rect())
-                    reference_point = ((rect.x0 + rect.x1) * 0.5, (rect.y0 + rect.y1) * 0.5)
+                    rect = chain.rect
+                    idx_list.append(i)
+                    txt_list.append(txt)
+                    ref_x.append((rect.x0 + rect.x1) * 0.5)
+                    ref_y.append((rect.y0 + rect.y1) * 0.5)
+                    letter_factor.append(self.letter_decay ** max(
+                        len(FormatAnalyzer.cleanup_text(txt)) - self.letter_decay_disregard, 0))
 
-                    dist = self.calc_distance(base_point, reference_point, page_threshold)
-                    if dist == -1:
-                        continue
-                    dist_exp = dist / (0.1 * page_diag)
+            self.cached_page = html_page
+            self.cached_matches = (idx_list, txt_list, numpy.array(ref_x, dtype=float),
+                                   numpy.array(ref_y, dtype=float), numpy.array(letter_factor, dtype=float))
+            return self.cached_matches
 
-                    score_base = self.score * (self.score_decay ** dist_exp) * (self.letter_decay ** max(
-                        len(FormatAnalyzer.cleanup_text(txt)) - self.letter_decay_disregard, 0))
+        def match(self, html_page, cur_item_idx):
+            """
+            Match the pattern anywhere on the page near the current item.
+
+            Args:
+                html_page: An instance of the HTML page.
+                cur_item_idx (int): The index of the current item.
+
+            Returns:
+                tuple: A tuple (bool, float) indicating whether there is a match and the final score.
+            """
+            idx_list, txt_list, ref_x, ref_y, letter_factor = self.get_page_matches(html_page)
+            base_rect = html_page.get_item_rect(cur_item_idx)
+            base_point = ((base_rect.x0 + base_rect.x1) * 0.5, (base_rect.y0 + base_rect.y1) * 0.5)
+            page_diag = (html_page.page_width ** 2 + html_page.page_height ** 2) ** 0.5
+            page_threshold = page_diag * 0.0007
 
-                    matches.append((i, txt, score_base))
+            dist = self.calc_distances(base_point, ref_x, ref_y, page_threshold)
+            dist_exp = dist / (0.1 * page_diag)
+            score_base = self.score * numpy.power(self.score_decay, dist_exp) * letter_factor
 
-            matches = sorted(matches, key=lambda m: - m[2])  # sort desc by score_base
+            valid = numpy.flatnonzero(dist != -1)
+            order = valid[numpy.argsort(-score_base[valid], kind='stable')]  # sort desc by score_base
+            scores = score_base[order].tolist()
 
-            if len(matches) > 0:
+            if len(scores) > 0 and config_for_rb.global_verbosity >= 8:
+                matches = [(idx_list[k], txt_list[k], s) for k, s in zip(order.tolist(), scores)]  # list of (idx, txt, score_base)
                 print_verbose(8, 'AnywhereRegExMatch.match of item ' + str(
                     html_page.items[cur_item_idx]) + ' matches with: ' + str(matches))
 
             final_score = 0
             num_hits = 0
-            for i in range(len(matches)):
+            for s in scores:
                 if self.matching_mode == MATCHING_MUST_EXCLUDE:
                     return False, -1  # we matched something that must not be included
 
-                final_score += matches[i][2] * (self.multi_match_decay ** num_hits)
+                final_score += s * (self.multi_match_decay ** num_hits)
                 num_hits += 1
 
-            if self.matching_mode in (MATCHING_MUST_INCLUDE, MATCHING_MUST_INCLUDE_EACH_NODE) and len(matches) == 0:
+            if self.matching_mode in (MATCHING_MUST_INCLUDE, MATCHING_MUST_INCLUDE_EACH_NODE) and len(scores) == 0:
                 return False, 0  # something must be included was never matched
 
             return True, final_score
@@ -368,26 +563,50 @@ class KPISpecs:
 
         return final_score >= self.minimum_score_desc_regex and final_score > 0, final_score
 
+    def may_match_txt(self, txt, txt_lower):
+        """Quick check, if nodes taken from a text can be matched by match_nodes at all.
+           Used for skipping pages that don't contain any KPI.
+
+        Args:
+            txt (str): Text of all nodes (e.g., all items of a page), separated by whitespaces.
+            txt_lower (str): Same, but lower-case.
+
+        Returns:
+            bool: False, if match_nodes would never match, True if it might.
+        """
+        at_least_one_match = False
+        for d in self.desc_regex_match_list:
+            may_match = d.may_match_txt(txt, txt_lower)
+            if d.matching_mode == MATCHING_MUST_INCLUDE and not may_match:
+                return False  # must be included, but is not included
+            if (d.matching_mode in (MATCHING_MAY_INCLUDE, MATCHING_MUST_INCLUDE,
+                                    MATCHING_MUST_INCLUDE_EACH_NODE) and d.count_if_matched and may_match):
+                at_least_one_match = True
+        return at_least_one_match
+
     def match_unit(self, unit_str):
         for u in self.unit_regex_match_list:
             if not u.match(unit_str):
                 return False
         return True
 
-    # check if extracted value is a match
-    def match_value(self, val_str):
-        if self.value_must_be_numeric and (val_str == '' or not FormatAnalyzer.looks_numeric(val_str)):
+    # check if extracted value is a match. format_flags of val_str can be given, if they are already known
+    def match_value(self, val_str, format_flags=None):
+        if format_flags is None:
+            format_flags = FormatAnalyzer.classify(val_str)[0]
+
+        if self.value_must_be_numeric and (val_str == '' or not format_flags & FORMAT_NUMERIC):
             return False
 
         if self.value_percentage_match == VALUE_PERCENTAGE_MUST:
-            if not FormatAnalyzer.looks_percentage(val_str):
+            if not format_flags & FORMAT_PERCENTAGE:
                 return False
 
         if self.value_percentage_match == VALUE_PERCENTAGE_MUST_NOT:
-            if FormatAnalyzer.looks_percentage(val_str):
+            if format_flags & FORMAT_PERCENTAGE:
                 return False
 
-        if self.value_must_be_year and not FormatAnalyzer.looks_year(val_str):
+        if self.value_must_be_year and not format_flags & FORMAT_YEAR:
             return False  # this is not a year!
 
         for v in self.value_regex_match_list:
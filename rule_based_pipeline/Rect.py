@@ -12,6 +12,8 @@ class Rect:
     A Class representing a rectangle with various geometric operations.
     """
 
+    __slots__ = ('x0', 'y0', 'x1', 'y1')
+
     def __init__(self, x0_=0, y0_=0, x1_=0, y1_=0):
         """
         Initialize a Rect object.
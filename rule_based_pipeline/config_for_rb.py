@@ -32,7 +32,8 @@ global_evaluation_only = False
 
 global_rendering_font_override = r"default_font.otf"
 global_approx_font_name = r"default_font.otf"  # use this font as approximation
-global_max_identify_complex_items_timeout = 0.5  # seconds
+global_max_identify_complex_items_operations = 10000  # max. number of search steps (not time based, so results are reproducible)
+global_max_cluster_items_euclidian = 5000  # pages with more items are not clustered by euclidian distance (needs O(n^2) memory). a flat cluster of all items is used instead
 
 global_force_special_items_into_table = True
 global_row_connection_threshold = 10.0  # default=5 . If there is empty space for that many times the previous row height, we will consider this as two distinct tables
@@ -45,3 +46,4 @@ global_html_encoding = "utf-8"  # default: "ascii"
 global_ignore_all_years = False  # default: False. Set it to true to ignore all years for every KPI (this is used for CDP reports)
 
 global_analyze_multiple_pages_at_one = False  # default: False. Set it to True, to additionally search for KPIs on multiple (currently: 2) subsequent pages at once.
+global_multiple_pages_table_margin = 0.2  # fraction of page height. subsequent pages are only analyzed at once, if a table is within this margin at the bottom of the first or at the top of the second page
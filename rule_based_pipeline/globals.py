@@ -27,6 +27,14 @@ CAT_MISC = 7  # probably belongs to figures
 CAT_FOOTER = 8  # bugfix 26.07.2022
 CAT_FOOTNOTE = 9  # new categories for finding footnotes
 
+# Format classification flags (see FormatAnalyzer.classify)
+FORMAT_NUMERIC = 1
+FORMAT_WEAK_NUMERIC = 2
+FORMAT_YEAR = 4
+FORMAT_PERCENTAGE = 8
+FORMAT_WORDS = 16
+FORMAT_RUNNING_TEXT = 32
+
 # Other constants
 DEFAULT_VTHRESHOLD = 15.0 / 609.0  # 609px is sample page width
 DEFAULT_SPECIAL_ITEM_MAX_DIST = 15.0 / 609.0  # 609px is sample page width
@@ -350,7 +350,7 @@ def analyze_pages(directory, guess_year, kpis, do_wait):
         KPIResultSet: Results of the analysis.
     """
     print_big("Analyze Pages", do_wait)
-    ana = AnalyzerDirectory(directory, guess_year)
+    ana = AnalyzerDirectory(directory, guess_year, kpis)
     kpi_results = KPIResultSet(ana.find_multiple_kpis(kpis))
     return kpi_results
 
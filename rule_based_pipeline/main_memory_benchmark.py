@@ -0,0 +1,86 @@
+# ============================================================================================================================
+# PDF_Analyzer
+# File   : main_memory_benchmark.py
+#
+# Note   : Measures how many bytes the parsed HTMLPages of one HTML directory keep alive (per page), so that changes to
+#          the memory layout of HTMLItem, HTMLWord, Rect, HTMLCluster and KPIMeasure can be compared before/after.
+# ============================================================================================================================
+import argparse
+import gc
+import tracemalloc
+from glob import glob
+
+import config_for_rb
+from globals import remove_trailing_slash
+from HTMLPage import HTMLPage
+
+
+def parse_arguments():
+    """
+    Parse command-line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description='Memory benchmark for parsed HTML pages')
+    parser.add_argument('html_dir', type=str, help='HTML directory (output of pdftohtml_mod) or directory with jpage*.json')
+    parser.add_argument('--json', action='store_true', help='Load jpage*.json files instead of parsing page*.html')
+    return parser.parse_args()
+
+
+def measure_page(html_dir, file, from_json):
+    """
+    Loads a single page and measures the number of bytes that remain allocated for it.
+
+    Args:
+        html_dir (str): Path to the HTML directory.
+        file (str): Path to the page file (HTML or JSON).
+        from_json (bool): True, if file is a JSON file created by HTMLPage.save_to_file.
+
+    Returns:
+        tuple: (page, retained bytes, number of items, number of words)
+    """
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    if from_json:
+        page = HTMLPage.load_from_file(file)
+    else:
+        page = HTMLPage.parse_html_file(html_dir, file)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    num_words = sum(len(it.words) for it in page.items)
+    return page, retained, len(page.items), num_words
+
+
+def main():
+    args = parse_arguments()
+    config_for_rb.global_verbosity = 0
+    html_dir = remove_trailing_slash(args.html_dir)
+    files = sorted(glob(html_dir + ('/jpage*.json' if args.json else '/page*.html')))
+
+    pages = []  # keep all pages alive, like HTMLDirectory does
+    tot_bytes = 0
+    tot_items = 0
+    tot_words = 0
+
+    tracemalloc.start()
+    for file in files:
+        page, retained, num_items, num_words = measure_page(html_dir, file, args.json)
+        pages.append(page)
+        tot_bytes += retained
+        tot_items += num_items
+        tot_words += num_words
+        print(f'{file}: {retained} bytes, {num_items} items, {num_words} words')
+    tracemalloc.stop()
+
+    if len(pages) == 0:
+        print('No pages found in ' + html_dir)
+        return
+
+    print(f'Pages: {len(pages)}, total: {tot_bytes} bytes, per page: {tot_bytes // len(pages)} bytes, '
+          f'per item (incl. words): {tot_bytes // max(tot_items, 1)} bytes')
+
+
+# Entry point of the program
+if __name__ == "__main__":
+    main()